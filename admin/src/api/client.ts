@@ -5,7 +5,7 @@ import type {
   FileAsset,
   LoginResponse,
   Product,
-  Purchase
+  PurchasePage
 } from "../types";
 
 const baseURL = (
@@ -85,10 +85,10 @@ export const deleteVariant = async (variantId: number): Promise<Product[]> => {
 };
 
 export const fetchPurchases = async (
-  params: { status?: string; product_type?: string } = {}
-): Promise<Purchase[]> => {
-  const { data } = await api.get<{ items: Purchase[] }>("/admin/panel/purchases", { params });
-  return data.items;
+  params: { status?: string; product_type?: string; cursor?: string } = {}
+): Promise<PurchasePage> => {
+  const { data } = await api.get<PurchasePage>("/admin/panel/purchases", { params });
+  return data;
 };
 
 export const fetchFileAssets = async (): Promise<FileAsset[]> => {
@@ -20,23 +20,27 @@ const PurchasesPage = () => {
   const [error, setError] = useState<string | null>(null);
   const [statusFilter, setStatusFilter] = useState("");
   const [typeFilter, setTypeFilter] = useState("");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+
+  const load = async (cursor?: string) => {
+    try {
+      const page = await fetchPurchases({
+        status: statusFilter || undefined,
+        product_type: typeFilter || undefined,
+        cursor
+      });
+      setPurchases((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor ?? null);
+      setError(null);
+    } catch (err) {
+      console.error(err);
+      setError("Не удалось загрузить покупки");
+    } finally {
+      setLoading(false);
+    }
+  };
 
   useEffect(() => {
-    const load = async () => {
-      try {
-        const data = await fetchPurchases({
-          status: statusFilter || undefined,
-          product_type: typeFilter || undefined
-        });
-        setPurchases(data);
-        setError(null);
-      } catch (err) {
-        console.error(err);
-        setError("Не удалось загрузить покупки");
-      } finally {
-        setLoading(false);
-      }
-    };
     load();
   }, [statusFilter, typeFilter]);
 
@@ -107,6 +111,11 @@ const PurchasesPage = () => {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <button type="button" onClick={() => load(nextCursor)}>
+              Загрузить ещё
+            </button>
+          )}
         </div>
       )}
     </div>
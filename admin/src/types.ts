@@ -55,6 +55,11 @@ export interface Purchase {
   updated_at: string;
 }
 
+export interface PurchasePage {
+  items: Purchase[];
+  next_cursor?: string | null;
+}
+
 export interface FileAsset {
   id: number;
   product_type: string;
@@ -15,6 +15,7 @@ if str(BASE_DIR) not in sys.path:
     sys.path.append(str(BASE_DIR))
 
 from app.core.config import get_settings  # noqa: E402
+from app.core.db import connect_args  # noqa: E402
 from app.models import Base  # noqa: E402
 
 config = context.config
@@ -53,6 +54,7 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
         future=True,
+        connect_args=connect_args(settings),
     )
 
     async def run_async_migrations() -> None:
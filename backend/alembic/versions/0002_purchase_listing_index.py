@@ -0,0 +1,23 @@
+"""composite index for keyset pagination of purchases"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0002_purchase_listing_index"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchase_sessions_created_at_id",
+        "purchase_sessions",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchase_sessions_created_at_id", table_name="purchase_sessions")
@@ -0,0 +1,25 @@
+"""partial index on expires_at for purchases the cleanup job still has to expire"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_expires_at_live_index"
+down_revision = "0002_purchase_listing_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchase_sessions_expires_at_live",
+        "purchase_sessions",
+        ["expires_at"],
+        unique=False,
+        postgresql_where=sa.text("expires_at IS NOT NULL AND status <> 'expired'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchase_sessions_expires_at_live", table_name="purchase_sessions")
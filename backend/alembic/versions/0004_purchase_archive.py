@@ -0,0 +1,67 @@
+"""archive tables for retired purchases and their token events"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_purchase_archive"
+down_revision = "0003_expires_at_live_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_token_events_purchase_id"), "token_events", ["purchase_id"], unique=False)
+
+    # Monthly partitions are created on demand by app.jobs.archive.ensure_archive_partitions.
+    op.create_table(
+        "purchase_sessions_archive",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Integer()),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("variant_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("digiseller_order_id", sa.String(length=120)),
+        sa.Column("invoice_url", sa.String(length=512)),
+        sa.Column("token", sa.String(length=128)),
+        sa.Column("domain_type", sa.String(length=50)),
+        sa.Column("expires_at", sa.DateTime(timezone=True)),
+        sa.Column("delivered_at", sa.DateTime(timezone=True)),
+        sa.Column("metadata", postgresql.JSONB(astext_type=sa.Text())),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "archived_at"),
+        postgresql_partition_by="RANGE (archived_at)",
+    )
+    op.create_index(
+        op.f("ix_purchase_sessions_archive_digiseller_order_id"),
+        "purchase_sessions_archive",
+        ["digiseller_order_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "token_events_archive",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("purchase_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=32), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text())),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "archived_at"),
+        postgresql_partition_by="RANGE (archived_at)",
+    )
+    op.create_index(
+        op.f("ix_token_events_archive_purchase_id"), "token_events_archive", ["purchase_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_token_events_archive_purchase_id"), table_name="token_events_archive")
+    op.drop_table("token_events_archive")
+    op.drop_index(op.f("ix_purchase_sessions_archive_digiseller_order_id"), table_name="purchase_sessions_archive")
+    op.drop_table("purchase_sessions_archive")
+    op.drop_index(op.f("ix_token_events_purchase_id"), table_name="token_events")
@@ -0,0 +1,37 @@
+"""pool of pre-generated Digiseller invoices"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_prepared_invoices"
+down_revision = "0004_purchase_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "prepared_invoices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("variant_id", sa.Integer(), sa.ForeignKey("product_variants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("digiseller_order_id", sa.String(length=120), nullable=False),
+        sa.Column("invoice_url", sa.String(length=512), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(timezone=True)),
+        sa.Column("purchase_id", sa.Integer(), sa.ForeignKey("purchase_sessions.id", ondelete="SET NULL")),
+    )
+    op.create_index(
+        "ix_prepared_invoices_available",
+        "prepared_invoices",
+        ["variant_id", "id"],
+        unique=False,
+        postgresql_where=sa.text("claimed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prepared_invoices_available", table_name="prepared_invoices")
+    op.drop_table("prepared_invoices")
@@ -0,0 +1,40 @@
+"""inbox for deduplicated Digiseller webhooks"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006_webhook_inbox"
+down_revision = "0005_prepared_invoices"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_inbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.String(length=120), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("payload_hash", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("processed_at", sa.DateTime(timezone=True)),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text()),
+        sa.UniqueConstraint("order_id", "status", "payload_hash", name="uq_webhook_inbox_delivery"),
+    )
+    op.create_index(
+        "ix_webhook_inbox_pending",
+        "webhook_inbox",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_inbox_pending", table_name="webhook_inbox")
+    op.drop_table("webhook_inbox")
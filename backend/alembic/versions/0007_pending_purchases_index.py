@@ -0,0 +1,25 @@
+"""partial index over pending purchases for the reconciliation poller"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_pending_purchases_index"
+down_revision = "0006_webhook_inbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchase_sessions_pending",
+        "purchase_sessions",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchase_sessions_pending", table_name="purchase_sessions")
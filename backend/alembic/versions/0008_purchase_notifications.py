@@ -0,0 +1,38 @@
+"""outbox of purchase notifications for the bot"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_purchase_notifications"
+down_revision = "0007_pending_purchases_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "purchase_notifications",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("purchase_id", sa.Integer()),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=False),
+        sa.Column("event", sa.String(length=32), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("claimed_until", sa.DateTime(timezone=True)),
+        sa.Column("delivered_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        "ix_purchase_notifications_undelivered",
+        "purchase_notifications",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("delivered_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchase_notifications_undelivered", table_name="purchase_notifications")
+    op.drop_table("purchase_notifications")
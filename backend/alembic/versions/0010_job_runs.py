@@ -0,0 +1,46 @@
+"""job run history and daily purchase stats"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_job_runs"
+down_revision = "0009_broadcasts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_name", sa.String(length=64), nullable=False),
+        sa.Column("trigger", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("duration_ms", sa.Integer()),
+        sa.Column("rows_touched", sa.Integer()),
+        sa.Column("error", sa.Text()),
+    )
+    op.create_index("ix_job_runs_job_started", "job_runs", ["job_name", "started_at"], unique=False)
+
+    op.create_table(
+        "daily_purchase_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_type", sa.String(length=50), nullable=False),
+        sa.Column("created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("paid", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("delivered", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refunded", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("day", "product_type", name="uq_daily_purchase_stats_day_type"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_purchase_stats")
+    op.drop_index("ix_job_runs_job_started", table_name="job_runs")
+    op.drop_table("job_runs")
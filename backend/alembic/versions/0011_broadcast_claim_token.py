@@ -0,0 +1,19 @@
+"""per-claim token for broadcast leases"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_broadcast_claim_token"
+down_revision = "0010_job_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcasts", sa.Column("claim_token", sa.String(length=32)))
+
+
+def downgrade() -> None:
+    op.drop_column("broadcasts", "claim_token")
@@ -1,29 +1,44 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+import hmac
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from ..core.config import Settings, get_settings
-from ..core.security import decode_access_token, verify_password
+from ..core.security import decode_access_token, verify_password_async
 
 
 http_bearer = HTTPBearer(auto_error=False)
-from ..core.db import get_session
+from ..core.db import AsyncSessionMaker, ReadSessionMaker, get_session, replica_router
+from ..core.read_routing import wants_primary
 
 
 async def get_db_session(session=Depends(get_session)):
     return session
 
 
+async def get_read_session(request: Request):
+    """Session for read-only endpoints: the replica when it is healthy and the client has not just written."""
+    use_replica = not wants_primary(request) and await replica_router.available()
+    async with (ReadSessionMaker if use_replica else AsyncSessionMaker)() as session:
+        yield session
+
+
 def get_app_settings() -> Settings:
     return get_settings()
 
 
-def validate_admin_password(password: str) -> bool:
+async def validate_admin_password(password: str) -> bool:
     settings = get_settings()
     if not settings.admin_password_hash:
         return False
-    return verify_password(password, settings.admin_password_hash)
+    return await verify_password_async(password, settings.admin_password_hash)
+
+
+def get_client_ip(request: Request) -> str:
+    # nginx overwrites X-Real-IP with the peer address; without it every client would share nginx's.
+    return request.headers.get("x-real-ip") or (request.client.host if request.client else "unknown")
 
 
 def get_admin_token(credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer)) -> dict:
@@ -33,3 +48,12 @@ def get_admin_token(credentials: HTTPAuthorizationCredentials | None = Depends(h
     if not payload or payload.get("sub") != "admin":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     return payload
+
+
+def require_internal_token(token: str | None = Header(default=None, alias="X-Internal-Token")) -> None:
+    """Guard for bot-facing endpoints; they stay closed until ``internal_api_token`` is configured."""
+    expected = get_settings().internal_api_token
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Internal API is not configured")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid internal token")
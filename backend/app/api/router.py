@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .routes import admin, admin_panel, health, products, purchases, tokens, users
+from .routes import admin, admin_panel, broadcasts, health, notifications, products, purchases, tokens, users
 
 api_router = APIRouter()
 
@@ -11,3 +11,5 @@ api_router.include_router(tokens.router)
 api_router.include_router(admin.router)
 api_router.include_router(users.router)
 api_router.include_router(admin_panel.router)
+api_router.include_router(notifications.router)
+api_router.include_router(broadcasts.router)
@@ -1,19 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from ...api.deps import get_app_settings, get_db_session
-from ...models import PurchaseSession, TokenEvent
-from ...models.enums import PurchaseStatus, TokenEventType
 from ...services.digiseller import DigisellerClient
 from ...services.tokens import TokenManager
+from ...services.webhooks import PurchaseNotFound, store_webhook, webhook_inbox_worker
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -24,12 +20,6 @@ class DigisellerWebhookPayload(BaseModel):
     details: dict[str, Any] | None = None
 
 
-async def _append_event(session: AsyncSession, purchase: PurchaseSession, event_type: TokenEventType, payload: dict | None = None) -> None:
-    event = TokenEvent(purchase_id=purchase.id, event_type=event_type.value, payload=payload or {})
-    session.add(event)
-    await session.flush()
-
-
 @router.post("/digiseller/webhook")
 async def digiseller_webhook(
     payload: DigisellerWebhookPayload,
@@ -44,38 +34,29 @@ async def digiseller_webhook(
         if not DigisellerClient.verify_signature(settings.digiseller_secret, signature or "", payload.model_dump()):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
 
-    stmt = (
-        select(PurchaseSession)
-        .options(selectinload(PurchaseSession.product))
-        .where(PurchaseSession.digiseller_order_id == payload.order_id)
-    )
-    purchase = await session.scalar(stmt)
-    if not purchase:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Purchase session not found")
-
-    manager = TokenManager(settings)
-    status_lower = payload.status.lower()
-
-    if status_lower in {"paid", "pay", "completed", "complete"}:
-        purchase.status = PurchaseStatus.PAID.value
-        if not purchase.token:
-            token = manager.generate_token()
-            purchase.token = token
-            purchase.expires_at = manager.expires_at()
-            await _append_event(session, purchase, TokenEventType.ISSUED, payload={"order_id": payload.order_id})
-    elif status_lower in {"refunded", "cancelled", "canceled"}:
-        purchase.status = PurchaseStatus.REFUNDED.value
-        purchase.token = None
-        await _append_event(session, purchase, TokenEventType.FAILED, payload={"status": status_lower})
-    else:
-        await _append_event(session, purchase, TokenEventType.OPENED, payload={"status": status_lower})
-
-    purchase.extra = (purchase.extra or {}) | {"digiseller": payload.details or {}}
+    inbox_id, duplicate = await store_webhook(session, payload.model_dump())
+
+    if settings.webhook_mode == "inbox":
+        await session.commit()
+        if not duplicate:
+            webhook_inbox_worker.notify()
+        return {"status": "accepted", "inbox_id": inbox_id, "duplicate": duplicate}
+
+    # Inline: a redelivery of a row that failed before is processed again, so a 404
+    # keeps the provider retrying until the purchase is visible.
+    try:
+        purchase = await webhook_inbox_worker.process_one(session, inbox_id)
+    except PurchaseNotFound as exc:
+        await session.commit()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
     await session.commit()
+    if purchase is None:
+        return {"status": "accepted", "inbox_id": inbox_id, "duplicate": True}
 
     response = {"status": "ok", "purchase_id": purchase.id, "current_status": purchase.status}
 
     if purchase.token:
+        manager = TokenManager(settings)
         domain = manager.domain_for_type(purchase.domain_type or purchase.product.type)
         response["token_url"] = manager.build_link(domain, purchase.token)
         response["expires_at"] = purchase.expires_at
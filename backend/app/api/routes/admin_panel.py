@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
-from ...api.deps import get_admin_token, get_app_settings, get_db_session, validate_admin_password
+from ...api.deps import (
+    get_admin_token,
+    get_app_settings,
+    get_client_ip,
+    get_db_session,
+    get_read_session,
+    validate_admin_password,
+)
 from ...core.config import Settings
-from ...core.security import create_access_token
-from ...models import FileAsset, Product, ProductVariant, PurchaseSession, User
-from ...models.enums import PurchaseStatus
+from ...core.security import create_access_token, login_throttle
+from ...jobs.registry import JOBS
+from ...models import Broadcast, FileAsset, JobRun, Product, ProductVariant, PurchaseSession, User
+from ...models.enums import BroadcastStatus
 from ...schemas.admin import (
     AdminLoginRequest,
     AdminLoginResponse,
@@ -25,6 +35,15 @@ from ...schemas.admin import (
     VariantCreate,
     VariantUpdate,
 )
+from ...schemas.broadcast import BroadcastCreate, BroadcastOut
+from ...schemas.job import JobOut, JobRunOut
+from ...services.broadcasts import ACTIVE_STATUSES, create_broadcast
+from ...services.catalog import catalog_cache, file_assets_cache
+from ...services.dashboard import dashboard_cache
+from ...services.jobs import STATUS_RUNNING, job_runner
+from ...services.purchases import decode_cursor, encode_cursor, purchase_with_product
+from ...services.scheduler import scheduler
+from ...services.tokens import TokenManager
 
 router = APIRouter(prefix="/admin/panel", tags=["admin-panel"])
 
@@ -36,55 +55,39 @@ async def _fetch_products(session: AsyncSession) -> list[Product]:
 
 
 @router.post("/auth/login", response_model=AdminLoginResponse)
-async def admin_login(payload: AdminLoginRequest, settings: Settings = Depends(get_app_settings)) -> AdminLoginResponse:
+async def admin_login(
+    payload: AdminLoginRequest,
+    settings: Settings = Depends(get_app_settings),
+    client_ip: str = Depends(get_client_ip),
+) -> AdminLoginResponse:
     if not settings.admin_password_hash:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Admin access is not configured")
-    if not validate_admin_password(payload.password):
+    retry_after = login_throttle.retry_after(client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+    login_throttle.hit(client_ip)
+    if not await validate_admin_password(payload.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
+    login_throttle.reset(client_ip)
     access_token = create_access_token("admin")
     return AdminLoginResponse(access_token=access_token, expires_in=settings.admin_token_expire_minutes * 60)
 
 
 @router.get("/dashboard/summary", response_model=AdminSummary)
 async def admin_summary(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_session),
     _: dict = Depends(get_admin_token),
 ) -> AdminSummary:
-    users_total = await session.scalar(select(func.count(User.id))) or 0
-    products_total = await session.scalar(select(func.count(Product.id))) or 0
-    active_products = await session.scalar(select(func.count(Product.id)).where(Product.is_active.is_(True))) or 0
-    purchases_total = await session.scalar(select(func.count(PurchaseSession.id))) or 0
-    purchases_pending = await session.scalar(
-        select(func.count(PurchaseSession.id)).where(PurchaseSession.status == PurchaseStatus.PENDING.value)
-    ) or 0
-    purchases_paid = await session.scalar(
-        select(func.count(PurchaseSession.id)).where(PurchaseSession.status == PurchaseStatus.PAID.value)
-    ) or 0
-    purchases_delivered = await session.scalar(
-        select(func.count(PurchaseSession.id)).where(PurchaseSession.status == PurchaseStatus.DELIVERED.value)
-    ) or 0
-    tokens_active = await session.scalar(
-        select(func.count(PurchaseSession.id)).where(
-            PurchaseSession.token.is_not(None),
-            PurchaseSession.status.in_([PurchaseStatus.PAID.value, PurchaseStatus.DELIVERED.value]),
-        )
-    ) or 0
-
-    return AdminSummary(
-        users_total=users_total,
-        products_total=products_total,
-        active_products=active_products,
-        purchases_total=purchases_total,
-        purchases_pending=purchases_pending,
-        purchases_paid=purchases_paid,
-        purchases_delivered=purchases_delivered,
-        tokens_active=tokens_active,
-    )
+    return await dashboard_cache.summary(session)
 
 
 @router.get("/products", response_model=ProductListResponse)
 async def admin_products(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_session),
     _: dict = Depends(get_admin_token),
 ) -> ProductListResponse:
     products = await _fetch_products(session)
@@ -110,6 +113,7 @@ async def admin_create_product(
     session.add(product)
     await session.flush()
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
@@ -132,6 +136,7 @@ async def admin_update_product(
         else:
             setattr(product, field, value)
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
@@ -147,6 +152,7 @@ async def admin_delete_product(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     await session.delete(product)
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
@@ -174,6 +180,7 @@ async def admin_create_variant(
     session.add(variant)
     await session.flush()
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
@@ -195,6 +202,7 @@ async def admin_update_variant(
         else:
             setattr(variant, field, value)
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
@@ -210,33 +218,59 @@ async def admin_delete_variant(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Variant not found")
     await session.delete(variant)
     await session.commit()
+    catalog_cache.invalidate()
     products = await _fetch_products(session)
     return ProductListResponse(items=products)
 
 
 @router.get("/purchases", response_model=PurchaseListResponse)
 async def admin_purchases(
-    status_filter: str | None = Query(default=None, alias="status"),
-    product_type: str | None = Query(default=None),
-    session: AsyncSession = Depends(get_db_session),
+    filters: PurchaseListFilters = Depends(),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    session: AsyncSession = Depends(get_read_session),
     _: dict = Depends(get_admin_token),
 ) -> PurchaseListResponse:
-    filters = []
-    if status_filter:
-        filters.append(PurchaseSession.status == status_filter)
-    if product_type:
-        filters.append(PurchaseSession.product.has(Product.type == product_type))
+    conditions = []
+    if filters.status:
+        conditions.append(PurchaseSession.status == filters.status)
+    if filters.product_type:
+        conditions.append(PurchaseSession.product.has(Product.type == filters.product_type))
+    if filters.telegram_id is not None:
+        conditions.append(PurchaseSession.user.has(User.telegram_id == filters.telegram_id))
+    if filters.digiseller_order_id:
+        conditions.append(PurchaseSession.digiseller_order_id == filters.digiseller_order_id)
+    if filters.created_from:
+        conditions.append(PurchaseSession.created_at >= filters.created_from)
+    if filters.created_to:
+        conditions.append(PurchaseSession.created_at < filters.created_to)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        # Row comparison walks ix_purchase_sessions_created_at_id backwards from the cursor.
+        conditions.append(tuple_(PurchaseSession.created_at, PurchaseSession.id) < tuple_(cursor_created_at, cursor_id))
 
     stmt = (
         select(PurchaseSession)
         .options(joinedload(PurchaseSession.product), joinedload(PurchaseSession.variant))
-        .where(*filters)  # no effect if empty
-        .order_by(PurchaseSession.created_at.desc())
-        .limit(200)
+        .where(*conditions)  # no effect if empty
+        .order_by(PurchaseSession.created_at.desc(), PurchaseSession.id.desc())
+        .limit(limit + 1)
     )
     result = await session.execute(stmt)
     purchases = result.scalars().all()
-    return PurchaseListResponse(items=purchases)
+
+    next_cursor = None
+    if len(purchases) > limit:
+        purchases = purchases[:limit]
+        next_cursor = encode_cursor(purchases[-1])
+    manager = TokenManager()
+    return PurchaseListResponse(
+        items=[purchase_with_product(item, manager) for item in purchases],
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/files", response_model=list[FileAssetOut])
@@ -258,6 +292,7 @@ async def admin_create_file(
     session.add(asset)
     await session.flush()
     await session.commit()
+    file_assets_cache.invalidate()
     return await admin_list_files(session)
 
 
@@ -275,6 +310,7 @@ async def admin_update_file(
     for field, value in update_data.items():
         setattr(asset, field, value)
     await session.commit()
+    file_assets_cache.invalidate()
     return await admin_list_files(session)
 
 
@@ -289,4 +325,131 @@ async def admin_delete_file(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File asset not found")
     await session.delete(asset)
     await session.commit()
+    file_assets_cache.invalidate()
     return await admin_list_files(session)
+
+
+@router.get("/broadcasts", response_model=list[BroadcastOut])
+async def admin_list_broadcasts(
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_db_session),
+    _: dict = Depends(get_admin_token),
+) -> list[BroadcastOut]:
+    result = await session.execute(select(Broadcast).order_by(Broadcast.id.desc()).limit(limit))
+    return list(result.scalars().all())
+
+
+@router.post("/broadcasts", response_model=BroadcastOut, status_code=status.HTTP_201_CREATED)
+async def admin_create_broadcast(
+    payload: BroadcastCreate,
+    session: AsyncSession = Depends(get_db_session),
+    _: dict = Depends(get_admin_token),
+) -> BroadcastOut:
+    broadcast = await create_broadcast(session, payload.text)
+    await session.commit()
+    await session.refresh(broadcast)
+    return broadcast
+
+
+@router.get("/broadcasts/{broadcast_id}", response_model=BroadcastOut)
+async def admin_get_broadcast(
+    broadcast_id: int,
+    session: AsyncSession = Depends(get_db_session),
+    _: dict = Depends(get_admin_token),
+) -> BroadcastOut:
+    broadcast = await session.get(Broadcast, broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    return broadcast
+
+
+@router.post("/broadcasts/{broadcast_id}/cancel", response_model=BroadcastOut)
+async def admin_cancel_broadcast(
+    broadcast_id: int,
+    session: AsyncSession = Depends(get_db_session),
+    _: dict = Depends(get_admin_token),
+) -> BroadcastOut:
+    broadcast = await session.get(Broadcast, broadcast_id, with_for_update=True)
+    if not broadcast:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    if broadcast.status in ACTIVE_STATUSES:
+        # The sender sees the new status at its next checkpoint and stops.
+        broadcast.status = BroadcastStatus.CANCELLED.value
+        broadcast.claimed_until = None
+        broadcast.finished_at = datetime.now(timezone.utc)
+    await session.commit()
+    await session.refresh(broadcast)
+    return broadcast
+
+
+@router.get("/jobs", response_model=list[JobOut])
+async def admin_list_jobs(
+    session: AsyncSession = Depends(get_db_session),
+    settings: Settings = Depends(get_app_settings),
+    _: dict = Depends(get_admin_token),
+) -> list[JobOut]:
+    # Latest run per job, served by ix_job_runs_job_started.
+    result = await session.execute(
+        select(JobRun).distinct(JobRun.job_name).order_by(JobRun.job_name, JobRun.started_at.desc())
+    )
+    last_runs = {run.job_name: run for run in result.scalars().all()}
+    held = await job_runner.held_locks(session)
+    now = datetime.now(timezone.utc)
+    jobs = []
+    for spec in JOBS.values():
+        # Next run times are only known in the worker currently running the scheduler.
+        scheduled = scheduler.scheduler.get_job(spec.name) if scheduler.scheduler.running else None
+        last_run = last_runs.get(spec.name)
+        # A "running" row is only live while its job lock is held and within the runtime limit;
+        # otherwise the worker died or hung mid-run and the row is stale.
+        running = (
+            last_run is not None
+            and last_run.status == STATUS_RUNNING
+            and spec.name in held
+            and (now - last_run.started_at).total_seconds() <= job_runner.max_runtime(spec.name)
+        )
+        jobs.append(
+            JobOut(
+                name=spec.name,
+                description=spec.description,
+                enabled=spec.enabled(settings),
+                schedule=str(spec.trigger(settings)),
+                max_runtime_seconds=job_runner.max_runtime(spec.name),
+                next_run_at=scheduled.next_run_time if scheduled else None,
+                running=running,
+                stale=last_run is not None and last_run.status == STATUS_RUNNING and not running,
+                last_run=JobRunOut.model_validate(last_run) if last_run else None,
+            )
+        )
+    return jobs
+
+
+@router.get("/jobs/{name}/runs", response_model=list[JobRunOut])
+async def admin_job_runs(
+    name: str,
+    limit: int = Query(default=20, ge=1, le=200),
+    session: AsyncSession = Depends(get_db_session),
+    _: dict = Depends(get_admin_token),
+) -> list[JobRunOut]:
+    if name not in JOBS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    result = await session.execute(
+        select(JobRun).where(JobRun.job_name == name).order_by(JobRun.started_at.desc()).limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+@router.post("/jobs/{name}/run", status_code=status.HTTP_202_ACCEPTED)
+async def admin_run_job(
+    name: str,
+    settings: Settings = Depends(get_app_settings),
+    _: dict = Depends(get_admin_token),
+) -> dict:
+    spec = JOBS.get(name)
+    if spec is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if not spec.enabled(settings):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job is disabled")
+    # Overlap with a scheduled run is resolved by the runner's lock: the loser is recorded as skipped.
+    job_runner.trigger(name)
+    return {"status": "accepted", "job": name}
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...api.deps import get_app_settings, get_db_session, require_internal_token
+from ...core.db import AsyncSessionMaker
+from ...schemas.broadcast import BroadcastClaim, BroadcastProgress
+from ...services.broadcasts import CLAIM_LOST, claim_broadcast, record_progress, stream_recipients
+
+router = APIRouter(prefix="/broadcasts", tags=["broadcasts"], dependencies=[Depends(require_internal_token)])
+
+
+@router.post("/claim", response_model=BroadcastClaim, responses={204: {"description": "Nothing to send"}})
+async def claim_next_broadcast(
+    session: AsyncSession = Depends(get_db_session),
+    settings=Depends(get_app_settings),
+):
+    broadcast = await claim_broadcast(session, settings)
+    await session.commit()
+    if broadcast is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return broadcast
+
+
+@router.get("/recipients")
+async def broadcast_recipients(
+    after: int = Query(default=0, ge=0),
+    limit: int = Query(default=1000, ge=1, le=50_000),
+) -> StreamingResponse:
+    """Newline-delimited ``user_id telegram_id`` pairs after the checkpoint ``after``."""
+
+    async def lines():
+        # The generator opens its own session: the request-scoped one is closed
+        # before a streaming body is sent.
+        async for user_id, telegram_id in stream_recipients(AsyncSessionMaker, after, limit):
+            yield f"{user_id} {telegram_id}\n"
+
+    return StreamingResponse(lines(), media_type="text/plain")
+
+
+@router.post("/{broadcast_id}/progress")
+async def broadcast_progress(
+    broadcast_id: int,
+    payload: BroadcastProgress,
+    session: AsyncSession = Depends(get_db_session),
+    settings=Depends(get_app_settings),
+) -> dict[str, str]:
+    current = await record_progress(session, broadcast_id, payload, settings)
+    await session.commit()
+    if current is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Broadcast not found")
+    if current == CLAIM_LOST:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Broadcast claimed by another sender")
+    return {"status": current}
@@ -1,8 +1,12 @@
+from typing import Any
+
 from fastapi import APIRouter
 
+from ...core.db import engine, pool_metrics
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/healthz")
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> dict[str, Any]:
+    return {"status": "ok", "db_pool": pool_metrics.snapshot(engine.pool)}
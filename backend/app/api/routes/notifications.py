@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...api.deps import get_app_settings, get_db_session, require_internal_token
+from ...schemas.notification import NotificationAck, NotificationOut
+from ...services.notifications import acknowledge_notifications, claim_notifications
+
+router = APIRouter(prefix="/notifications", tags=["notifications"], dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/", response_model=list[NotificationOut])
+async def poll_notifications(
+    wait: float = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=500),
+    session: AsyncSession = Depends(get_db_session),
+    settings=Depends(get_app_settings),
+) -> list[NotificationOut]:
+    """Long-poll for purchase notifications; returns as soon as any are leased or after ``wait`` seconds."""
+    deadline = time.monotonic() + min(wait, settings.notifications_wait_seconds)
+    while True:
+        rows = await claim_notifications(session, limit, settings)
+        # Commit every attempt so the connection is not held while waiting.
+        await session.commit()
+        if rows or time.monotonic() >= deadline:
+            return [NotificationOut.model_validate(row) for row in rows]
+        await asyncio.sleep(min(settings.notifications_poll_interval, max(deadline - time.monotonic(), 0)))
+
+
+@router.post("/ack")
+async def ack_notifications(payload: NotificationAck, session: AsyncSession = Depends(get_db_session)) -> dict[str, int]:
+    acknowledged = await acknowledge_notifications(session, payload.ids)
+    await session.commit()
+    return {"acknowledged": acknowledged}
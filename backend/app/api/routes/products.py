@@ -1,39 +1,38 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
-from ...api.deps import get_db_session
-from ...models import Product
+from ...api.deps import get_app_settings, get_read_session
+from ...core.caching import cached_json
 from ...schemas.product import ProductListResponse, ProductOut
+from ...services.catalog import catalog_cache
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
+def _cache_control(settings) -> str:
+    return f"public, max-age={settings.catalog_http_max_age}"
+
+
 @router.get("/", response_model=ProductListResponse)
 async def list_products(
-    session=Depends(get_db_session),
+    request: Request,
+    session=Depends(get_read_session),
+    settings=Depends(get_app_settings),
     product_type: str | None = Query(default=None, alias="type"),
-) -> ProductListResponse:
-    stmt = select(Product).options(selectinload(Product.variants)).where(Product.is_active.is_(True))
-    if product_type:
-        stmt = stmt.where(Product.type == product_type)
-
-    result = await session.execute(stmt.order_by(Product.type, Product.id))
-    products = result.scalars().unique().all()
-    return ProductListResponse(items=products)
+) -> Response:
+    cached = await catalog_cache.listing(session, product_type or None)
+    return cached_json(request, cached.body, cached.etag, _cache_control(settings))
 
 
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: int, session=Depends(get_db_session)) -> ProductOut:
-    stmt = (
-        select(Product)
-        .options(selectinload(Product.variants))
-        .where(Product.id == product_id, Product.is_active.is_(True))
-    )
-    result = await session.execute(stmt)
-    product = result.scalars().first()
-    if not product:
+async def get_product(
+    product_id: int,
+    request: Request,
+    session=Depends(get_read_session),
+    settings=Depends(get_app_settings),
+) -> Response:
+    cached = await catalog_cache.product(session, product_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return cached_json(request, cached.body, cached.etag, _cache_control(settings))
@@ -5,11 +5,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from ...api.deps import get_db_session
+from ...api.deps import get_app_settings, get_db_session
 from ...models import ProductVariant, PurchaseSession, User
 from ...models.enums import PurchaseStatus
-from ...schemas.purchase import PurchaseCreate, PurchaseCreateResponse
-from ...services.digiseller import DigisellerClient, get_digiseller_client
+from ...schemas.purchase import PurchaseCreate, PurchaseCreateResponse, PurchaseStatusOut
+from ...services.digiseller import DigisellerClient, DigisellerUnavailable, get_digiseller_client
+from ...services.invoices import apply_invoice, claim_prepared_invoice, invoice_worker
 
 router = APIRouter(prefix="/purchases", tags=["purchases"])
 
@@ -19,62 +20,87 @@ async def create_purchase(
     payload: PurchaseCreate,
     session: AsyncSession = Depends(get_db_session),
     digiseller: DigisellerClient = Depends(get_digiseller_client),
+    settings=Depends(get_app_settings),
 ) -> PurchaseCreateResponse:
-    try:
-        user = await session.scalar(select(User).where(User.telegram_id == payload.telegram_id))
-        if not user:
-            user = User(
-                telegram_id=payload.telegram_id,
-                username=payload.username,
-                first_name=payload.first_name,
-                last_name=payload.last_name,
-                language_code=payload.language_code,
-            )
-            session.add(user)
-            await session.flush()
-        else:
-            user.username = payload.username or user.username
-            user.first_name = payload.first_name or user.first_name
-            user.last_name = payload.last_name or user.last_name
-            user.language_code = payload.language_code or user.language_code
-
-        stmt = (
-            select(ProductVariant)
-            .options(selectinload(ProductVariant.product))
-            .where(ProductVariant.id == payload.product_variant_id)
+    user = await session.scalar(select(User).where(User.telegram_id == payload.telegram_id))
+    if not user:
+        user = User(
+            telegram_id=payload.telegram_id,
+            username=payload.username,
+            first_name=payload.first_name,
+            last_name=payload.last_name,
+            language_code=payload.language_code,
         )
-        variant = await session.scalar(stmt)
-        if not variant or not variant.product or not variant.product.is_active:
-            raise HTTPException(status_code=404, detail="Product variant not found")
-
-        purchase = PurchaseSession(
-            user_id=user.id,
-            product_id=variant.product_id,
-            variant_id=variant.id,
-            status=PurchaseStatus.PENDING.value,
-            domain_type=variant.product.type,
-        )
-        session.add(purchase)
+        session.add(user)
         await session.flush()
+    else:
+        user.username = payload.username or user.username
+        user.first_name = payload.first_name or user.first_name
+        user.last_name = payload.last_name or user.last_name
+        user.language_code = payload.language_code or user.language_code
+
+    stmt = (
+        select(ProductVariant)
+        .options(selectinload(ProductVariant.product))
+        .where(ProductVariant.id == payload.product_variant_id)
+    )
+    variant = await session.scalar(stmt)
+    if not variant or not variant.product or not variant.product.is_active:
+        raise HTTPException(status_code=404, detail="Product variant not found")
 
-        payment_url = variant.payment_url
-        if not payment_url and variant.digiseller_product_id:
+    purchase = PurchaseSession(
+        user_id=user.id,
+        product_id=variant.product_id,
+        variant_id=variant.id,
+        status=PurchaseStatus.PENDING.value,
+        domain_type=variant.product.type,
+    )
+    session.add(purchase)
+    await session.flush()
+
+    payment_url = variant.payment_url
+    if payment_url or not variant.digiseller_product_id:
+        # Static payment link: there is no per-purchase invoice to track.
+        purchase.invoice_url = payment_url
+        purchase.digiseller_order_id = variant.digiseller_product_id
+    else:
+        prepared = await claim_prepared_invoice(session, variant.id, purchase.id) if settings.invoice_pool_enabled else None
+        if prepared:
+            apply_invoice(purchase, prepared)
+            payment_url = prepared.invoice_url
+        elif settings.invoice_mode == "async" and invoice_worker.can_accept():
+            await session.commit()
+            await session.refresh(purchase)
+            invoice_worker.enqueue(purchase.id)
+            return PurchaseCreateResponse(purchase=purchase, payment_url=None, invoice_pending=True)
+        else:
             try:
                 invoice = await digiseller.create_invoice(variant.digiseller_product_id)
-                purchase.digiseller_order_id = invoice.order_id
-                purchase.invoice_url = invoice.invoice_url
+                apply_invoice(purchase, invoice)
                 payment_url = invoice.invoice_url
+            except DigisellerUnavailable as exc:
+                raise HTTPException(status_code=503, detail="Digiseller is temporarily unavailable") from exc
             except Exception as exc:  # pragma: no cover - network failure path
                 raise HTTPException(
                     status_code=503,
                     detail="Unable to create Digiseller invoice",
                 ) from exc
-        else:
-            purchase.invoice_url = payment_url
-            purchase.digiseller_order_id = variant.digiseller_product_id
 
-        await session.commit()
-        await session.refresh(purchase)
-        return PurchaseCreateResponse(purchase=purchase, payment_url=payment_url)
-    finally:
-        await digiseller.close()
+    await session.commit()
+    await session.refresh(purchase)
+    return PurchaseCreateResponse(purchase=purchase, payment_url=payment_url)
+
+
+@router.get("/{purchase_id}", response_model=PurchaseStatusOut)
+async def get_purchase_status(purchase_id: int, session: AsyncSession = Depends(get_db_session)) -> PurchaseStatusOut:
+    """Poll target for purchases whose invoice is created in the background."""
+    purchase = await session.get(PurchaseSession, purchase_id)
+    if not purchase:
+        raise HTTPException(status_code=404, detail="Purchase not found")
+    return PurchaseStatusOut(
+        id=purchase.id,
+        status=purchase.status,
+        payment_url=purchase.invoice_url,
+        invoice_pending=purchase.status == PurchaseStatus.PENDING.value and not purchase.invoice_url,
+        error=(purchase.extra or {}).get("invoice_error"),
+    )
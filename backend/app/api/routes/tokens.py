@@ -2,31 +2,40 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from ...api.deps import get_app_settings, get_db_session
-from ...models import FileAsset, PurchaseSession, TokenEvent
+from ...core.caching import etag_matches, make_etag, not_modified
+from ...models import PurchaseSession, TokenEvent
 from ...models.enums import PurchaseStatus, TokenEventType
 from ...schemas.token import TokenActionResult, TokenDetailsOut, TokenSubmitPayload
-from ...services.tokens import TokenManager
+from ...services.catalog import file_assets_cache
+from ...services.events import count_token_event, token_event_sink
+from ...services.notifications import publish_purchase_update
+from ...services.tokens import TokenManager, negative_token_cache
 
 router = APIRouter(prefix="/tokens", tags=["tokens"])
 
+# Token pages are per-user secrets: browsers may keep them but must revalidate, proxies must not store them.
+TOKEN_CACHE_CONTROL = "private, no-cache"
+# Matches PurchaseSession.token; anything longer cannot exist and skips the lookup.
+MAX_TOKEN_LENGTH = 128
+
 
 async def _get_purchase_or_404(token: str, session: AsyncSession) -> PurchaseSession:
+    if len(token) > MAX_TOKEN_LENGTH or token in negative_token_cache:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Token not found")
     stmt = (
         select(PurchaseSession)
-        .options(
-            selectinload(PurchaseSession.product),
-            selectinload(PurchaseSession.variant),
-        )
+        .options(joinedload(PurchaseSession.product, innerjoin=True))
         .where(PurchaseSession.token == token)
     )
     purchase = await session.scalar(stmt)
     if not purchase:
+        negative_token_cache.add(token)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Token not found")
     return purchase
 
@@ -36,6 +45,7 @@ async def _ensure_active(purchase: PurchaseSession, session: AsyncSession) -> No
     if purchase.expires_at and purchase.expires_at < now:
         purchase.status = PurchaseStatus.EXPIRED.value
         purchase.token = None
+        await publish_purchase_update(session, purchase, product_title=purchase.product.title)
         await session.commit()
         raise HTTPException(status_code=status.HTTP_410_GONE, detail="Token expired")
     if purchase.status not in {PurchaseStatus.PAID.value, PurchaseStatus.DELIVERED.value}:
@@ -45,35 +55,52 @@ async def _ensure_active(purchase: PurchaseSession, session: AsyncSession) -> No
 async def _append_event(session: AsyncSession, purchase: PurchaseSession, event_type: TokenEventType, payload: dict | None = None) -> None:
     event = TokenEvent(purchase_id=purchase.id, event_type=event_type.value, payload=payload or {})
     session.add(event)
+    count_token_event(event_type)
     await session.flush()
 
 
 @router.get("/{token}", response_model=TokenDetailsOut)
-async def fetch_token_details(token: str, session: AsyncSession = Depends(get_db_session), settings=Depends(get_app_settings)) -> TokenDetailsOut:
+async def fetch_token_details(
+    token: str,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_db_session),
+    settings=Depends(get_app_settings),
+) -> TokenDetailsOut:
     purchase = await _get_purchase_or_404(token, session)
     await _ensure_active(purchase, session)
 
     manager = TokenManager(settings)
     domain = manager.domain_for_type(purchase.domain_type or purchase.product.type)
+    # Served from the file-asset cache, so cheap enough to resolve before the conditional check.
+    assets = await file_assets_cache.for_type(session, "vpn") if purchase.product.type == "vpn" else []
+
+    # The body also carries product fields and the download list, so admin edits must change the tag.
+    etag = make_etag(
+        purchase.id,
+        purchase.status,
+        purchase.updated_at.isoformat(),
+        purchase.expires_at,
+        purchase.product.updated_at.isoformat(),
+        settings.support_username,
+        domain,
+        assets,
+    )
+    if etag_matches(request, etag):
+        await token_event_sink.record(purchase.id, TokenEventType.OPENED)
+        return not_modified(etag, TOKEN_CACHE_CONTROL)
 
     metadata = dict(purchase.extra or {})
-    if purchase.product.type == "vpn":
-        assets = await session.execute(select(FileAsset).where(FileAsset.product_type == "vpn"))
-        downloads = [
-            {
-                "label": asset.label,
-                "url": f"https://{domain}/static/vpn/{asset.path}",
-            }
-            for asset in assets.scalars().all()
-        ]
-        if downloads:
-            metadata.setdefault("downloads", downloads)
+    downloads = [{"label": label, "url": f"https://{domain}/static/vpn/{path}"} for label, path in assets]
+    if downloads:
+        metadata.setdefault("downloads", downloads)
     if purchase.product.extra:
         metadata.setdefault("product", purchase.product.extra)
 
-    await _append_event(session, purchase, TokenEventType.OPENED)
-    await session.commit()
+    await token_event_sink.record(purchase.id, TokenEventType.OPENED)
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = TOKEN_CACHE_CONTROL
     return TokenDetailsOut(
         token=token,
         status=purchase.status,
@@ -115,6 +142,7 @@ async def complete_token(token: str, session: AsyncSession = Depends(get_db_sess
     purchase.delivered_at = now
     purchase.token = None
     await _append_event(session, purchase, TokenEventType.COMPLETED)
+    await publish_purchase_update(session, purchase, product_title=purchase.product.title)
     await session.commit()
 
     return TokenActionResult(status="success", message="Delivery marked as complete")
@@ -127,6 +155,7 @@ async def fail_token(token: str, session: AsyncSession = Depends(get_db_session)
 
     purchase.status = PurchaseStatus.FAILED.value
     await _append_event(session, purchase, TokenEventType.FAILED)
+    await publish_purchase_update(session, purchase, product_title=purchase.product.title)
     await session.commit()
 
     return TokenActionResult(status="failed", message="Token marked as failed")
@@ -142,6 +171,7 @@ async def confirm_delivery(token: str, session: AsyncSession = Depends(get_db_se
     purchase.delivered_at = now
     purchase.token = None
     await _append_event(session, purchase, TokenEventType.COMPLETED, payload={"source": "user_confirm"})
+    await publish_purchase_update(session, purchase, product_title=purchase.product.title)
     await session.commit()
 
     return TokenActionResult(status="success", message="Token confirmed by user")
@@ -3,7 +3,7 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import Literal
 
-from pydantic import AnyUrl, Field
+from pydantic import AnyUrl, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,12 +14,42 @@ class Settings(BaseSettings):
     api_prefix: str = "/api"
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
+    server_launcher: Literal["uvicorn", "gunicorn"] = "uvicorn"
+    web_concurrency: int = Field(default=1, description="API worker processes; 0 uses the CPU count.")
+    server_graceful_timeout: int = 30
+    server_max_requests: int = Field(default=0, description="gunicorn: recycle a worker after this many requests; 0 never.")
+    metrics_enabled: bool = Field(default=True, description="Serve Prometheus metrics on /metrics (outside api_prefix).")
 
     database_url: AnyUrl = Field(
         default="postgresql+asyncpg://okak:okak@db:5432/okak",
         description="SQLAlchemy connection string for async engine.",
     )
+    database_replica_url: AnyUrl | None = Field(
+        default=None,
+        description="Optional streaming replica for read-only endpoints (catalog, listings, dashboard).",
+    )
+    database_direct_url: AnyUrl | None = Field(
+        default=None,
+        description="Direct Postgres URL for session-level features (scheduler leader lock) when database_url is PgBouncer.",
+    )
     database_echo: bool = False
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_check_seconds: float = Field(default=5.0, description="How often replica lag is sampled.")
+    db_replica_check_timeout: float = 2.0
+    db_read_your_writes_seconds: int = Field(
+        default=10,
+        description="After a write, the same client reads from the primary for this long.",
+    )
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = Field(default=30.0, description="Seconds a request waits for a free connection before failing.")
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = Field(default=1800, description="Reconnect connections older than this many seconds; -1 never.")
+    db_statement_cache_size: int = Field(default=100, description="asyncpg prepared statements cached per connection.")
+    db_pgbouncer: bool = Field(
+        default=False,
+        description="Connect through PgBouncer in transaction mode: disables server-side prepared statement reuse.",
+    )
 
     token_ttl_days: int = 7
     support_username: str | None = None
@@ -34,9 +64,123 @@ class Settings(BaseSettings):
         default="https://api.digiseller.ru",
         description="Base URL for Digiseller REST API.",
     )
+    digiseller_timeout: float = 10.0
+    digiseller_connect_timeout: float = 5.0
+    digiseller_max_connections: int = 20
+    digiseller_max_keepalive_connections: int = 10
+    digiseller_retries: int = Field(default=2, description="Extra attempts for idempotent calls and failed connects.")
+    digiseller_retry_backoff: float = Field(default=0.2, description="Base delay in seconds for jittered exponential backoff.")
+    digiseller_breaker_threshold: int = Field(default=5, description="Consecutive failures that open the circuit; 0 disables it.")
+    digiseller_breaker_reset_seconds: float = 30.0
+
+    webhook_mode: Literal["inbox", "inline"] = Field(
+        default="inbox",
+        description="inbox: store and ack, a background worker applies it; inline: apply within the request.",
+    )
+    webhook_inbox_poll_seconds: float = 5.0
+    webhook_inbox_batch_size: int = 50
+    webhook_inbox_max_attempts: int = 5
+    webhook_inbox_retention_days: int = Field(default=30, description="Processed inbox rows older than this are purged.")
+
+    invoice_mode: Literal["sync", "async"] = Field(
+        default="sync",
+        description="async: commit the purchase first and create the invoice in a background worker.",
+    )
+    invoice_worker_concurrency: int = 4
+    invoice_queue_size: int = 1000
+    invoice_recovery_window_seconds: int = Field(
+        default=3600,
+        description="On startup, re-queue un-invoiced purchases created within this window.",
+    )
+    invoice_retry_attempts: int = Field(
+        default=5,
+        description="Attempts before a purchase whose invoice keeps failing transiently (5xx, timeouts, open breaker) is FAILED.",
+    )
+    invoice_retry_backoff_seconds: float = Field(default=5.0, description="Delay before the first retry; doubles per attempt.")
+    invoice_pool_enabled: bool = Field(
+        default=False,
+        description="Pre-generate invoices for variants whose metadata sets invoice_pool_size.",
+    )
+    invoice_pool_refill_seconds: int = 30
+    invoice_pool_refill_batch: int = 10
+    invoice_pool_concurrency: int = 4
+    invoice_pool_ttl_minutes: int = Field(default=60, description="Unused prepared invoices are dropped after this long.")
+
+    notifications_enabled: bool = Field(
+        default=True,
+        description="Record purchase status changes in an outbox the bot long-polls to message users.",
+    )
+    internal_api_token: str = Field(default="", description="Shared secret the bot sends to internal endpoints.")
+    notifications_wait_seconds: float = Field(default=25.0, description="Upper bound for a notifications long-poll.")
+    notifications_poll_interval: float = Field(default=1.0, description="How often a waiting long-poll re-checks the outbox.")
+    notifications_lease_seconds: int = Field(default=60, description="Unacknowledged notifications are redelivered after this.")
+    notifications_retention_days: int = Field(default=7, description="Outbox rows older than this are purged.")
+    broadcast_lease_seconds: int = Field(
+        default=120,
+        description="A broadcast whose sender sent no checkpoint for this long is resumed by another bot.",
+    )
+
+    catalog_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Upper bound on catalog snapshot age; 0 keeps it until the next admin edit.",
+    )
+    catalog_http_max_age: int = Field(
+        default=30,
+        description="Cache-Control max-age for catalog responses (shared caches such as nginx honor it).",
+    )
+
+    token_negative_cache_size: int = Field(default=10_000, description="Unknown tokens remembered per process.")
+    token_negative_cache_ttl_seconds: int = Field(default=60, description="How long an unknown token is answered from memory.")
+
+    token_event_mode: Literal["buffered", "sync"] = Field(
+        default="buffered",
+        description="buffered: page-view events are batched in memory; sync: each event is inserted immediately.",
+    )
+    token_event_flush_interval_ms: int = 500
+    token_event_batch_size: int = 200
+    token_event_queue_size: int = 10_000
+
+    admin_summary_cache_ttl_seconds: int = Field(
+        default=5,
+        description="How long the admin dashboard summary is reused; 0 queries on every request.",
+    )
 
     scheduler_enabled: bool = True
+    scheduler_leader_election: bool = Field(
+        default=True,
+        description="Run scheduled jobs only in the process holding a Postgres advisory lock.",
+    )
+    leader_check_seconds: float = 15.0
+    job_max_runtime_seconds: int = Field(default=1800, description="A scheduled job running longer than this is cancelled.")
+    job_max_runtime_overrides: dict[str, int] = Field(
+        default_factory=dict,
+        description='Per-job runtime limits, e.g. {"reconcile": 300}.',
+    )
+    job_runs_retention_days: int = Field(default=30, description="Job run history older than this is purged.")
     cleanup_cron: str = "0 * * * *"  # every hour
+    cleanup_batch_size: int = Field(default=500, description="Rows updated or deleted per cleanup transaction.")
+    cleanup_batch_pause_seconds: float = Field(default=0.05, description="Pause between cleanup batches.")
+
+    reconcile_enabled: bool = True
+    reconcile_cron: str = "*/10 * * * *"
+    reconcile_stale_minutes: int = Field(default=15, description="Only purchases pending longer than this are polled.")
+    reconcile_max_age_hours: int = Field(default=72, description="Purchases older than this are no longer polled.")
+    reconcile_page_size: int = 100
+    reconcile_concurrency: int = 5
+    reconcile_rate_per_second: float = 5.0
+
+    retention_mode: Literal["delete", "table", "jsonl"] = Field(
+        default="table",
+        description="What happens to purchases past retention: drop them, move them to *_archive tables, or to gzip JSONL.",
+    )
+    retention_expired_days: int = Field(default=0, description="Days after expiry before an expired purchase is retired.")
+    retention_delivered_days: int = Field(default=30, description="Days after delivery before a purchase is retired.")
+    retention_archive_dir: str = Field(default="archive", description="Directory for JSONL archives (retention_mode=jsonl).")
+    archive_cron: str = "30 * * * *"
+
+    stats_rollup_enabled: bool = True
+    stats_rollup_cron: str = "*/15 * * * *"
+    stats_rollup_days: int = Field(default=2, description="Trailing days recomputed by each stats rollup.")
 
     cors_allow_origins: list[str] = Field(default_factory=lambda: ["*"])
     cors_allow_credentials: bool = True
@@ -48,6 +192,20 @@ class Settings(BaseSettings):
     admin_password_hash: str = Field(default="", description="Bcrypt hash for admin panel access")
     admin_jwt_secret: str = Field(default="change_me", description="Secret key for admin JWT tokens")
     admin_token_expire_minutes: int = 60
+    admin_token_cache_size: int = Field(default=256, description="Verified admin JWTs kept in memory; 0 disables the cache.")
+    admin_jwt_backend: Literal["jose", "pyjwt"] = Field(
+        default="jose",
+        description="Library that signs and verifies admin JWTs; pyjwt is faster, both issue compatible HS256 tokens.",
+    )
+    admin_password_concurrency: int = Field(default=2, description="bcrypt checks running at once in worker threads.")
+    admin_login_max_attempts: int = Field(default=10, description="Login attempts per client IP per window; 0 disables.")
+    admin_login_window_seconds: float = 300.0
+
+    @field_validator("database_replica_url", "database_direct_url", mode="before")
+    @classmethod
+    def _empty_url_is_unset(cls, value):
+        # `OKAK_DATABASE_REPLICA_URL=` in .env means "not configured".
+        return value or None
 
 
 @lru_cache(maxsize=1)
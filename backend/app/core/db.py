@@ -1,17 +1,204 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+import uuid
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .metrics import REGISTRY, Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+
+DB_CHECKOUT_WAIT = Histogram(
+    "okak_db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including waits for a free one.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CONNECTIONS = Gauge("okak_db_pool_connections", "Pool connections by state.", ("pool", "state"))
+DB_POOL_TIMEOUTS = Counter("okak_db_pool_timeouts_total", "Checkouts that gave up waiting for a connection.")
+
+_checkout_wait = DB_CHECKOUT_WAIT.labels()
+
+
+@dataclass
+class PoolMetrics:
+    """Counters for connection checkouts; ``wait`` is the time a checkout blocked on a busy pool."""
+
+    checkouts: int = 0
+    slow_checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    slow_threshold: float = 0.01
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        self.checkouts += 1
+        _checkout_wait.observe(seconds)
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        if seconds >= self.slow_threshold:
+            self.slow_checkouts += 1
+        if timed_out:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Any) -> dict[str, Any]:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout takes, including waits for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            pool_metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+def connect_args(settings: Settings) -> dict[str, Any]:
+    if settings.db_pgbouncer:
+        # In PgBouncer transaction mode consecutive statements may land on different
+        # server connections, so named prepared statements must not be reused.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return {"statement_cache_size": settings.db_statement_cache_size}
+
+
+def build_engine(url: str, settings: Settings) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.database_echo,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle,
+        connect_args=connect_args(settings),
+    )
+
+
+def build_lock_engine(settings: Settings) -> AsyncEngine:
+    """Unpooled autocommit engine for connections that hold session-level advisory locks.
+
+    Through PgBouncer in transaction mode such locks need ``database_direct_url``.
+    """
+    url = settings.database_direct_url or settings.database_url
+    return create_async_engine(
+        url.unicode_string(),
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+        connect_args=connect_args(settings),
+    )
+
+
+# Zero while the replica has replayed everything it received; otherwise the age of the last replayed commit.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """Decides whether the read replica may serve reads.
+
+    Replication lag is sampled at most every ``db_replica_check_seconds``; a
+    replica that lags more than ``db_replica_max_lag_seconds`` or cannot be
+    reached is skipped until the next sample.
+    """
+
+    def __init__(self, replica: AsyncEngine | None, settings: Settings):
+        self.replica = replica
+        self.settings = settings
+        self.lag: float | None = None
+        self._healthy = False
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _sample_is_fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < self.settings.db_replica_check_seconds
+
+    async def available(self) -> bool:
+        if self.replica is None:
+            return False
+        if self._sample_is_fresh():
+            return self._healthy
+        async with self._lock:
+            if not self._sample_is_fresh():
+                await self._sample()
+            return self._healthy
+
+    async def _sample(self) -> None:
+        try:
+            async with asyncio.timeout(self.settings.db_replica_check_timeout):
+                async with self.replica.connect() as connection:
+                    self.lag = float(await connection.scalar(REPLICA_LAG_SQL))
+            healthy = self.lag <= self.settings.db_replica_max_lag_seconds
+            if not healthy:
+                logger.warning("Replica lag %.1fs exceeds limit; reading from primary", self.lag)
+        except Exception as exc:
+            logger.warning("Replica unavailable, reading from primary: %s", exc)
+            self.lag = None
+            healthy = False
+        self._healthy = healthy
+        self._checked_at = time.monotonic()
 
 
 settings = get_settings()
-engine = create_async_engine(settings.database_url.unicode_string(), echo=settings.database_echo)
+engine = build_engine(settings.database_url.unicode_string(), settings)
 AsyncSessionMaker = async_sessionmaker(engine, expire_on_commit=False)
 
+replica_engine = (
+    build_engine(settings.database_replica_url.unicode_string(), settings) if settings.database_replica_url else None
+)
+ReadSessionMaker = async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else AsyncSessionMaker
+replica_router = ReplicaRouter(replica_engine, settings)
+
+
+def _collect_pool_stats() -> None:
+    for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+        if pool_engine is None:
+            continue
+        pool = pool_engine.pool
+        DB_POOL_CONNECTIONS.labels(name, "size").set(pool.size())
+        DB_POOL_CONNECTIONS.labels(name, "checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels(name, "idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels(name, "overflow").set(max(pool.overflow(), 0))
+    DB_POOL_TIMEOUTS.labels().value = pool_metrics.timeouts
+
+
+REGISTRY.on_collect(_collect_pool_stats)
+
 
 @asynccontextmanager
 async def lifespan(engine_override=None) -> AsyncIterator[None]:
@@ -19,9 +206,10 @@ async def lifespan(engine_override=None) -> AsyncIterator[None]:
         yield
     finally:
         await (engine_override or engine).dispose()
+        if engine_override is None and replica_engine is not None:
+            await replica_engine.dispose()
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     async with AsyncSessionMaker() as session:
         yield session
-
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds; tuned for API handlers and upstream HTTP calls.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; maintenance jobs run from milliseconds to many minutes.
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class _CounterChild:
+    __slots__ = ("labels", "value")
+
+    def __init__(self, labels: str):
+        self.labels = labels
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("labels", "buckets", "counts", "sum", "count")
+
+    def __init__(self, labels: str, buckets: tuple[float, ...]):
+        self.labels = labels
+        self.buckets = buckets
+        # Per-bucket (not cumulative) counts; the last slot is +Inf.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), registry: Registry | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+        (registry or REGISTRY).register(self)
+
+    def _new_child(self, labels: str) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """Return the series for ``values``, creating it on first use.
+
+        Callers on hot paths keep the returned object instead of looking it up per event.
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child(_format_labels(self.labelnames, values))
+        return child
+
+    def samples(self) -> Iterator[str]:
+        for child in list(self._children.values()):
+            yield f"{self.name}{child.labels} {child.value}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self, labels: str) -> _CounterChild:
+        return _CounterChild(labels)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self, labels: str) -> _GaugeChild:
+        return _GaugeChild(labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs: Any):
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_labels = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self, labels: str) -> _HistogramChild:
+        return _HistogramChild(labels, self.buckets)
+
+    def samples(self) -> Iterator[str]:
+        for child in list(self._children.values()):
+            # Splice "le" into the child's label set.
+            prefix = child.labels[:-1] + "," if child.labels else "{"
+            cumulative = 0
+            for bound, count in zip(self._bucket_labels, child.counts):
+                cumulative += count
+                yield f'{self.name}_bucket{prefix}le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{child.labels} {child.sum}"
+            yield f"{self.name}_count{child.labels} {child.count}"
+
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` before each scrape, e.g. to copy pool stats into gauges."""
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            callback()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_LATENCY = Histogram(
+    "okak_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_RESPONSES = Counter(
+    "okak_http_responses_total",
+    "HTTP responses by route template and status class.",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge("okak_http_requests_in_flight", "HTTP requests currently being served.")
+
+UNMATCHED_ROUTE = "<unmatched>"
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+class _RouteSeries:
+    __slots__ = ("latency", "responses")
+
+    def __init__(self, method: str, route: str):
+        self.latency = HTTP_LATENCY.labels(method, route)
+        self.responses = [HTTP_RESPONSES.labels(method, route, status) for status in STATUS_CLASSES]
+
+    def observe(self, seconds: float, status_code: int) -> None:
+        self.latency.observe(seconds)
+        self.responses[min(max(status_code // 100, 1), 5) - 1].inc()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route template.
+
+    The template comes from the route the router matched (``scope["route"]``),
+    so path parameters never become label values. Series are built once per
+    route and then reused: a request costs a dict lookup, a bisect and a few
+    additions.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._series: dict[int, _RouteSeries] = {}
+        self._unmatched = _RouteSeries("", UNMATCHED_ROUTE)
+        self._in_flight = HTTP_IN_FLIGHT.labels()
+
+    def _series_for(self, route: Any) -> _RouteSeries:
+        # Routes are unhashable (APIRoute defines __eq__); they live as long as the app, so id() is stable.
+        series = self._series.get(id(route))
+        if series is None:
+            methods = ",".join(sorted(getattr(route, "methods", None) or ()))
+            series = self._series[id(route)] = _RouteSeries(methods, getattr(route, "path", UNMATCHED_ROUTE))
+        return series
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            route = scope.get("route")
+            series = self._unmatched if route is None else self._series_for(route)
+            series.observe(time.perf_counter() - started, status_code)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import time
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+# Set on responses to writes; while it has not expired the client reads from the primary.
+READ_PRIMARY_COOKIE = "okak_rw"
+# Explicit opt-in for clients that keep no cookies (the bot sends it per user after a change).
+READ_PRIMARY_HEADER = "x-read-primary"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def wants_primary(request: Request) -> bool:
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return True
+    try:
+        return int(request.cookies.get(READ_PRIMARY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so their next reads skip the possibly lagging replica."""
+
+    def __init__(self, app: ASGIApp, window_seconds: int | None = None):
+        self.app = app
+        self.window_seconds = window_seconds if window_seconds is not None else get_settings().db_read_your_writes_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or self.window_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time()) + self.window_seconds
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until}; Max-Age={self.window_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
@@ -17,22 +22,149 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+_password_slots: asyncio.Semaphore | None = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` in a worker thread, at most ``admin_password_concurrency`` at a time.
+
+    bcrypt takes 100-300 ms of CPU; on the event loop it would stall every other request.
+    """
+    global _password_slots
+    if _password_slots is None:
+        _password_slots = asyncio.Semaphore(get_settings().admin_password_concurrency)
+    async with _password_slots:
+        return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+class LoginThrottle:
+    """Per-client sliding window of login attempts, kept in memory.
+
+    At most ``max_clients`` addresses are tracked; the least recently seen are
+    dropped first.
+    """
+
+    def __init__(self, max_attempts: int | None = None, window_seconds: float | None = None, max_clients: int = 10_000):
+        settings = get_settings()
+        self.max_attempts = max_attempts if max_attempts is not None else settings.admin_login_max_attempts
+        self.window_seconds = window_seconds if window_seconds is not None else settings.admin_login_window_seconds
+        self.max_clients = max_clients
+        self._attempts: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def retry_after(self, client: str) -> int:
+        """Seconds until ``client`` may try again; 0 if it may try now."""
+        attempts = self._attempts.get(client)
+        if not attempts:
+            return 0
+        cutoff = time.monotonic() - self.window_seconds
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        if len(attempts) < self.max_attempts:
+            return 0
+        return max(1, math.ceil(attempts[0] - cutoff))
+
+    def hit(self, client: str) -> None:
+        if self.max_attempts <= 0:
+            return
+        attempts = self._attempts.setdefault(client, deque(maxlen=self.max_attempts))
+        attempts.append(time.monotonic())
+        self._attempts.move_to_end(client)
+        while len(self._attempts) > self.max_clients:
+            self._attempts.popitem(last=False)
+
+    def reset(self, client: str) -> None:
+        self._attempts.pop(client, None)
+
+
+login_throttle = LoginThrottle()
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class VerifiedTokenCache:
+    """LRU of verified JWT payloads keyed by the token's SHA-256.
+
+    An entry is only served until the token's own ``exp``, so caching never
+    extends a token's lifetime.
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = maxsize if maxsize is not None else get_settings().admin_token_cache_size
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        self._entries[key] = (float(exp), payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def _encode(payload: Dict[str, Any], secret: str, backend: str) -> str:
+    if backend == "pyjwt":
+        import jwt as pyjwt
+
+        return pyjwt.encode(payload, secret, algorithm="HS256")
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def _decode(token: str, secret: str, backend: str) -> dict[str, Any] | None:
+    if backend == "pyjwt":
+        import jwt as pyjwt
+
+        try:
+            return pyjwt.decode(token, secret, algorithms=["HS256"])
+        except pyjwt.PyJWTError:
+            return None
+    try:
+        return jwt.decode(token, secret, algorithms=["HS256"])
+    except JWTError:
+        return None
+
+
 def create_access_token(subject: str, expires_minutes: int | None = None) -> str:
     settings = get_settings()
     expire_delta = timedelta(minutes=expires_minutes or settings.admin_token_expire_minutes)
     expire = datetime.now(timezone.utc) + expire_delta
-    payload: Dict[str, Any] = {"sub": subject, "exp": expire}
-    return jwt.encode(payload, settings.admin_jwt_secret, algorithm="HS256")
+    payload: Dict[str, Any] = {"sub": subject, "exp": int(expire.timestamp())}
+    token = _encode(payload, settings.admin_jwt_secret, settings.admin_jwt_backend)
+    verified_tokens.put(token, payload)
+    return token
 
 
 def decode_access_token(token: str) -> dict[str, Any] | None:
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
     settings = get_settings()
-    try:
-        payload = jwt.decode(token, settings.admin_jwt_secret, algorithms=["HS256"])
-    except JWTError:
-        return None
+    payload = _decode(token, settings.admin_jwt_secret, settings.admin_jwt_backend)
+    if payload is not None:
+        verified_tokens.put(token, payload)
     return payload
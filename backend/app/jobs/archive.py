@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.config import Settings, get_settings
+from ..models import PurchaseSession, PurchaseSessionArchive, TokenEvent, TokenEventArchive
+from ..models.enums import PurchaseStatus
+
+logger = logging.getLogger(__name__)
+
+purchases_table = PurchaseSession.__table__
+events_table = TokenEvent.__table__
+
+
+def retention_filter(now: datetime, settings: Settings):
+    """Purchases whose retention window has passed and which may leave the hot tables."""
+    return or_(
+        and_(
+            PurchaseSession.status == PurchaseStatus.EXPIRED.value,
+            PurchaseSession.expires_at < now - timedelta(days=settings.retention_expired_days),
+        ),
+        and_(
+            PurchaseSession.status == PurchaseStatus.DELIVERED.value,
+            PurchaseSession.delivered_at < now - timedelta(days=settings.retention_delivered_days),
+        ),
+    )
+
+
+def _month_bounds(moment: datetime) -> tuple[datetime, datetime]:
+    start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+async def ensure_archive_partitions(session: AsyncSession, moment: datetime) -> None:
+    start, end = _month_bounds(moment)
+    for table in (PurchaseSessionArchive.__tablename__, TokenEventArchive.__tablename__):
+        await session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+
+async def _delete(session: AsyncSession, ids: list[int], archived_at: datetime, settings: Settings) -> None:
+    # token_events rows go with the cascade (backed by ix_token_events_purchase_id).
+    await session.execute(delete(purchases_table).where(purchases_table.c.id.in_(ids)))
+
+
+async def _move_to_tables(session: AsyncSession, ids: list[int], archived_at: datetime, settings: Settings) -> None:
+    stamp = literal(archived_at, DateTime(timezone=True))
+    for source, target, key in (
+        (events_table, TokenEventArchive.__table__, events_table.c.purchase_id),
+        (purchases_table, PurchaseSessionArchive.__table__, purchases_table.c.id),
+    ):
+        columns = [column.name for column in source.columns]
+        await session.execute(
+            insert(target).from_select([*columns, "archived_at"], select(*source.columns, stamp).where(key.in_(ids)))
+        )
+    await _delete(session, ids, archived_at, settings)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _append_jsonl(path: Path, records: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Each append is a separate gzip member; readers see one continuous stream.
+    with gzip.open(path, "at", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps(record, default=_json_default, ensure_ascii=False) + "\n")
+
+
+async def _move_to_jsonl(session: AsyncSession, ids: list[int], archived_at: datetime, settings: Settings) -> None:
+    purchases = (await session.execute(select(purchases_table).where(purchases_table.c.id.in_(ids)))).mappings().all()
+    events = (
+        await session.execute(
+            select(events_table).where(events_table.c.purchase_id.in_(ids)).order_by(events_table.c.id)
+        )
+    ).mappings().all()
+
+    by_purchase: dict[int, list[dict[str, Any]]] = {}
+    for event in events:
+        by_purchase.setdefault(event["purchase_id"], []).append(dict(event))
+    records = [
+        dict(purchase) | {"archived_at": archived_at, "events": by_purchase.get(purchase["id"], [])}
+        for purchase in purchases
+    ]
+
+    path = Path(settings.retention_archive_dir) / f"purchases-{archived_at:%Y-%m}.jsonl.gz"
+    await asyncio.to_thread(_append_jsonl, path, records)
+    # Written before the delete commits: a crash here duplicates lines rather than losing rows.
+    await _delete(session, ids, archived_at, settings)
+
+
+_ARCHIVERS = {
+    "delete": _delete,
+    "table": _move_to_tables,
+    "jsonl": _move_to_jsonl,
+}
+
+
+async def archive_retired_purchases(session_factory: async_sessionmaker[None], batch_size: int | None = None) -> list[int]:
+    """Move purchases past their retention window (and their events) out of the hot tables.
+
+    Returns the number of purchases handled per batch.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.cleanup_batch_size
+    archiver = _ARCHIVERS[settings.retention_mode]
+    now = datetime.now(timezone.utc)
+
+    if settings.retention_mode == "table":
+        async with session_factory() as session:
+            await ensure_archive_partitions(session, now)
+            await session.commit()
+
+    processed: list[int] = []
+    while True:
+        async with session_factory() as session:
+            ids_stmt = (
+                select(PurchaseSession.id)
+                .where(retention_filter(now, settings))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            ids = list((await session.scalars(ids_stmt)).all())
+            if ids:
+                await archiver(session, ids, now, settings)
+            await session.commit()
+        if ids:
+            processed.append(len(ids))
+            logger.debug("Retention (%s) batch %s: %s purchases", settings.retention_mode, len(processed), len(ids))
+        if len(ids) < batch_size:
+            return processed
+        await asyncio.sleep(settings.cleanup_batch_pause_seconds)
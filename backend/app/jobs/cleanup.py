@@ -1,37 +1,124 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from ..models import PurchaseSession
+from ..core.config import get_settings
+from ..models import JobRun, PurchaseNotification, PurchaseSession, WebhookInbox
 from ..models.enums import PurchaseStatus
 
+logger = logging.getLogger(__name__)
 
-async def cleanup_expired_tokens(session_factory: async_sessionmaker[None]) -> int:
-    """Mark expired purchase sessions and remove stale rows."""
-    now = datetime.now(timezone.utc)
-    removed = 0
-    async with session_factory() as session:
-        result = await session.execute(
-            select(PurchaseSession).where(
-                PurchaseSession.expires_at.is_not(None),
-                PurchaseSession.expires_at < now,
-            )
-        )
-        for purchase in result.scalars().all():
-            purchase.status = PurchaseStatus.EXPIRED.value
-            purchase.token = None
-        await session.commit()
-
-        deleted = await session.execute(
-            delete(PurchaseSession).where(
-                PurchaseSession.status == PurchaseStatus.EXPIRED.value,
-                PurchaseSession.expires_at.is_not(None),
-                PurchaseSession.expires_at < now,
-            )
+
+@dataclass
+class CleanupReport:
+    expired_batches: list[int] = field(default_factory=list)
+    inbox_batches: list[int] = field(default_factory=list)
+    notification_batches: list[int] = field(default_factory=list)
+    job_run_batches: list[int] = field(default_factory=list)
+
+    @property
+    def expired(self) -> int:
+        return sum(self.expired_batches)
+
+    @property
+    def purged(self) -> int:
+        return sum(self.inbox_batches) + sum(self.notification_batches) + sum(self.job_run_batches)
+
+
+def _expire_batch(now: datetime, batch_size: int):
+    # Matches the partial index ix_purchase_sessions_expires_at_live.
+    ids = (
+        select(PurchaseSession.id)
+        .where(
+            PurchaseSession.status != PurchaseStatus.EXPIRED.value,
+            PurchaseSession.expires_at.is_not(None),
+            PurchaseSession.expires_at < now,
         )
-        removed = deleted.rowcount or 0
-        await session.commit()
-    return removed
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(PurchaseSession)
+        .where(PurchaseSession.id.in_(ids.scalar_subquery()))
+        .values(status=PurchaseStatus.EXPIRED.value, token=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _purge_inbox_batch(cutoff: datetime, batch_size: int):
+    ids = (
+        select(WebhookInbox.id)
+        .where(WebhookInbox.processed_at.is_not(None), WebhookInbox.processed_at < cutoff)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        delete(WebhookInbox)
+        .where(WebhookInbox.id.in_(ids.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _purge_batch(model, column, cutoff: datetime, batch_size: int):
+    ids = select(model.id).where(column < cutoff).limit(batch_size).with_for_update(skip_locked=True)
+    return delete(model).where(model.id.in_(ids.scalar_subquery())).execution_options(synchronize_session=False)
+
+
+async def _run_in_batches(session_factory: async_sessionmaker, build_statement, batch_size: int, pause: float, label: str) -> list[int]:
+    """Execute ``build_statement`` in short transactions until it touches fewer than ``batch_size`` rows."""
+    processed: list[int] = []
+    while True:
+        async with session_factory() as session:
+            result = await session.execute(build_statement(batch_size))
+            await session.commit()
+        count = result.rowcount or 0
+        if count:
+            processed.append(count)
+            logger.debug("Cleanup %s batch %s: %s rows", label, len(processed), count)
+        if count < batch_size:
+            return processed
+        await asyncio.sleep(pause)
+
+
+async def cleanup_expired_tokens(session_factory: async_sessionmaker[None], batch_size: int | None = None) -> CleanupReport:
+    """Mark expired purchase sessions and purge old inbox, outbox and job history rows.
+
+    Every step works a bounded batch per transaction. Retiring old purchases is
+    the separate ``archive`` job.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.cleanup_batch_size
+    pause = settings.cleanup_batch_pause_seconds
+    now = datetime.now(timezone.utc)
+
+    report = CleanupReport()
+    report.expired_batches = await _run_in_batches(
+        session_factory, lambda size: _expire_batch(now, size), batch_size, pause, "expire"
+    )
+    inbox_cutoff = now - timedelta(days=settings.webhook_inbox_retention_days)
+    report.inbox_batches = await _run_in_batches(
+        session_factory, lambda size: _purge_inbox_batch(inbox_cutoff, size), batch_size, pause, "inbox"
+    )
+    notifications_cutoff = now - timedelta(days=settings.notifications_retention_days)
+    report.notification_batches = await _run_in_batches(
+        session_factory,
+        lambda size: _purge_batch(PurchaseNotification, PurchaseNotification.created_at, notifications_cutoff, size),
+        batch_size,
+        pause,
+        "notifications",
+    )
+    job_runs_cutoff = now - timedelta(days=settings.job_runs_retention_days)
+    report.job_run_batches = await _run_in_batches(
+        session_factory,
+        lambda size: _purge_batch(JobRun, JobRun.started_at, job_runs_cutoff, size),
+        batch_size,
+        pause,
+        "job_runs",
+    )
+    return report
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.config import get_settings
+from ..models import PreparedInvoice, Product, ProductVariant
+from ..services.digiseller import DigisellerClient, DigisellerUnavailable, InvoiceResult, digiseller_client
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE_KEY = "invoice_pool_size"
+
+
+@dataclass
+class RefillReport:
+    created: int = 0
+    expired: int = 0
+    errors: int = 0
+
+
+def pool_size(variant: ProductVariant) -> int:
+    try:
+        return max(int((variant.extra or {}).get(POOL_SIZE_KEY) or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+async def refill_invoice_pools(
+    session_factory: async_sessionmaker[None],
+    client: DigisellerClient = digiseller_client,
+) -> RefillReport:
+    """Drop expired prepared invoices and top up every pooled variant to its ``invoice_pool_size``.
+
+    At most ``invoice_pool_refill_batch`` invoices are created per variant and run,
+    ``invoice_pool_concurrency`` at a time.
+    """
+    settings = get_settings()
+    now = datetime.now(timezone.utc)
+    report = RefillReport()
+
+    async with session_factory() as session:
+        result = await session.execute(delete(PreparedInvoice).where(PreparedInvoice.expires_at <= now))
+        report.expired = result.rowcount or 0
+        variants = (
+            await session.scalars(
+                select(ProductVariant)
+                .join(Product)
+                .where(
+                    Product.is_active.is_(True),
+                    ProductVariant.digiseller_product_id.is_not(None),
+                    ProductVariant.payment_url.is_(None),
+                )
+            )
+        ).all()
+        available = dict(
+            (
+                await session.execute(
+                    select(PreparedInvoice.variant_id, func.count(PreparedInvoice.id))
+                    .where(PreparedInvoice.claimed_at.is_(None))
+                    .group_by(PreparedInvoice.variant_id)
+                )
+            ).all()
+        )
+        await session.commit()
+
+    semaphore = asyncio.Semaphore(settings.invoice_pool_concurrency)
+
+    async def create(product_id: str) -> InvoiceResult:
+        async with semaphore:
+            return await client.create_invoice(product_id)
+
+    expires_at = now + timedelta(minutes=settings.invoice_pool_ttl_minutes)
+    rows: list[dict] = []
+    for variant in variants:
+        missing = min(pool_size(variant) - available.get(variant.id, 0), settings.invoice_pool_refill_batch)
+        if missing <= 0:
+            continue
+        results = await asyncio.gather(
+            *(create(variant.digiseller_product_id) for _ in range(missing)), return_exceptions=True
+        )
+        for outcome in results:
+            if isinstance(outcome, BaseException):
+                report.errors += 1
+                continue
+            rows.append(
+                {
+                    "variant_id": variant.id,
+                    "digiseller_order_id": outcome.order_id,
+                    "invoice_url": outcome.invoice_url,
+                    "created_at": now,
+                    "expires_at": expires_at,
+                }
+            )
+        if any(isinstance(outcome, DigisellerUnavailable) for outcome in results):
+            logger.warning("Digiseller unavailable, invoice pool refill stopped early")
+            break
+
+    if rows:
+        async with session_factory() as session:
+            await session.execute(insert(PreparedInvoice), rows)
+            await session.commit()
+    report.created = len(rows)
+    return report
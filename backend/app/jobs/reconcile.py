@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.config import get_settings
+from ..models import ProductVariant, PurchaseSession
+from ..models.enums import PurchaseStatus
+from ..services.digiseller import DigisellerClient, DigisellerUnavailable, digiseller_client
+from ..services.webhooks import PAID_STATUSES, REFUNDED_STATUSES, apply_digiseller_status
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    reconciled: int = 0
+    unchanged: int = 0
+    errored: int = 0
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across concurrent tasks."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _remote_status(data: dict[str, Any]) -> str:
+    return str(data.get("status") or data.get("state") or "").lower()
+
+
+async def reconcile_pending_purchases(
+    session_factory: async_sessionmaker[None],
+    client: DigisellerClient = digiseller_client,
+) -> ReconcileReport:
+    """Ask Digiseller about purchases stuck in PENDING and apply what it reports.
+
+    Purchases are read in id-ordered pages; lookups run ``reconcile_concurrency``
+    at a time and at most ``reconcile_rate_per_second`` per second. Paid and
+    refunded orders go through the same transition as the webhook.
+    """
+    settings = get_settings()
+    report = ReconcileReport()
+    if not settings.digiseller_api_key or not settings.digiseller_seller_id:
+        return report
+
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(minutes=settings.reconcile_stale_minutes)
+    oldest = now - timedelta(hours=settings.reconcile_max_age_hours)
+    semaphore = asyncio.Semaphore(settings.reconcile_concurrency)
+    limiter = RateLimiter(settings.reconcile_rate_per_second)
+
+    async def lookup(order_id: str) -> dict[str, Any]:
+        async with semaphore:
+            await limiter.wait()
+            return await client.get_invoice(order_id)
+
+    last_id = 0
+    while True:
+        async with session_factory() as session:
+            page = (
+                await session.execute(
+                    select(PurchaseSession.id, PurchaseSession.digiseller_order_id)
+                    .join(ProductVariant, ProductVariant.id == PurchaseSession.variant_id)
+                    .where(
+                        PurchaseSession.status == PurchaseStatus.PENDING.value,
+                        PurchaseSession.digiseller_order_id.is_not(None),
+                        # Static payment links reuse the Digiseller product id; there is no order to poll.
+                        ProductVariant.payment_url.is_(None),
+                        PurchaseSession.created_at < stale_before,
+                        PurchaseSession.created_at >= oldest,
+                        PurchaseSession.id > last_id,
+                    )
+                    .order_by(PurchaseSession.id)
+                    .limit(settings.reconcile_page_size)
+                )
+            ).all()
+        if not page:
+            break
+        last_id = page[-1].id
+
+        results = await asyncio.gather(*(lookup(row.digiseller_order_id) for row in page), return_exceptions=True)
+        for row, outcome in zip(page, results):
+            if isinstance(outcome, BaseException):
+                report.errored += 1
+                logger.debug("Reconcile lookup failed for order %s: %s", row.digiseller_order_id, outcome)
+                continue
+            remote_status = _remote_status(outcome)
+            if remote_status not in PAID_STATUSES | REFUNDED_STATUSES:
+                report.unchanged += 1
+                continue
+            try:
+                async with session_factory() as session:
+                    await apply_digiseller_status(
+                        session, row.digiseller_order_id, remote_status, {"reconciled": True, **outcome}, settings
+                    )
+                    await session.commit()
+            except Exception:
+                report.errored += 1
+                logger.exception("Failed to reconcile order %s", row.digiseller_order_id)
+            else:
+                report.reconciled += 1
+
+        if any(isinstance(outcome, DigisellerUnavailable) for outcome in results):
+            logger.warning("Digiseller unavailable, reconciliation stopped early")
+            break
+        if len(page) < settings.reconcile_page_size:
+            break
+    return report
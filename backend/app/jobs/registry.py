@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from ..core.config import Settings
+from ..core.db import AsyncSessionMaker
+from .archive import archive_retired_purchases
+from .cleanup import cleanup_expired_tokens
+from .invoice_pool import refill_invoice_pools
+from .reconcile import reconcile_pending_purchases
+from .rollups import rollup_daily_stats
+
+
+def _always(settings: Settings) -> bool:
+    return True
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """A maintenance job: what to run, when, and how to count the rows it touched."""
+
+    name: str
+    description: str
+    run: Callable[[], Awaitable[Any]]
+    trigger: Callable[[Settings], BaseTrigger]
+    rows_touched: Callable[[Any], int]
+    enabled: Callable[[Settings], bool] = _always
+
+
+JOBS: dict[str, JobSpec] = {
+    spec.name: spec
+    for spec in (
+        JobSpec(
+            name="cleanup",
+            description="Expire stale purchase sessions, purge old inbox, outbox and job history rows",
+            run=lambda: cleanup_expired_tokens(AsyncSessionMaker),
+            trigger=lambda settings: CronTrigger.from_crontab(settings.cleanup_cron, timezone="UTC"),
+            rows_touched=lambda report: report.expired + report.purged,
+        ),
+        JobSpec(
+            name="archive",
+            description="Retire purchases past retention according to retention_mode",
+            run=lambda: archive_retired_purchases(AsyncSessionMaker),
+            trigger=lambda settings: CronTrigger.from_crontab(settings.archive_cron, timezone="UTC"),
+            rows_touched=sum,
+        ),
+        JobSpec(
+            name="reconcile",
+            description="Poll Digiseller for purchases stuck in pending",
+            run=lambda: reconcile_pending_purchases(AsyncSessionMaker),
+            trigger=lambda settings: CronTrigger.from_crontab(settings.reconcile_cron, timezone="UTC"),
+            rows_touched=lambda report: report.reconciled,
+            enabled=lambda settings: settings.reconcile_enabled,
+        ),
+        JobSpec(
+            name="invoice_pool",
+            description="Top up prepared invoice pools and drop stale invoices",
+            run=lambda: refill_invoice_pools(AsyncSessionMaker),
+            trigger=lambda settings: IntervalTrigger(seconds=settings.invoice_pool_refill_seconds),
+            rows_touched=lambda report: report.created + report.expired,
+            enabled=lambda settings: settings.invoice_pool_enabled,
+        ),
+        JobSpec(
+            name="stats_rollup",
+            description="Recompute daily purchase counters for the trailing days",
+            run=lambda: rollup_daily_stats(AsyncSessionMaker),
+            trigger=lambda settings: CronTrigger.from_crontab(settings.stats_rollup_cron, timezone="UTC"),
+            rows_touched=int,
+            enabled=lambda settings: settings.stats_rollup_enabled,
+        ),
+    )
+}
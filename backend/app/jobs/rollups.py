@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.config import get_settings
+from ..models import DailyPurchaseStats, Product, PurchaseSession
+from ..models.enums import PurchaseStatus
+
+
+async def rollup_daily_stats(session_factory: async_sessionmaker[None], days: int | None = None) -> int:
+    """Recompute per-day purchase counters for the last ``days`` days (today included).
+
+    Counts are by creation day and current status, so recent days settle as
+    purchases are paid and delivered. Older days are left as they were, which
+    keeps their stats after the purchases themselves are archived.
+    Returns the number of stats rows written.
+    """
+    settings = get_settings()
+    days = days or settings.stats_rollup_days
+    today = datetime.now(timezone.utc).date()
+    since = datetime.combine(today - timedelta(days=days - 1), time.min, tzinfo=timezone.utc)
+
+    day = cast(func.timezone("UTC", PurchaseSession.created_at), Date)
+    status = PurchaseSession.status
+    source = (
+        select(
+            day.label("day"),
+            Product.type.label("product_type"),
+            func.count().label("created"),
+            func.count().filter(status.in_([PurchaseStatus.PAID.value, PurchaseStatus.DELIVERED.value])).label("paid"),
+            func.count().filter(status == PurchaseStatus.DELIVERED.value).label("delivered"),
+            func.count().filter(status == PurchaseStatus.REFUNDED.value).label("refunded"),
+            literal(datetime.now(timezone.utc)).label("updated_at"),
+        )
+        .join(Product, Product.id == PurchaseSession.product_id)
+        .where(PurchaseSession.created_at >= since)
+        .group_by(day, Product.type)
+    )
+    columns = ["day", "product_type", "created", "paid", "delivered", "refunded", "updated_at"]
+    stmt = pg_insert(DailyPurchaseStats).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_daily_purchase_stats_day_type",
+        set_={name: stmt.excluded[name] for name in columns[2:]},
+    )
+    async with session_factory() as session:
+        result = await session.execute(stmt)
+        await session.commit()
+    return result.rowcount or 0
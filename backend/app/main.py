@@ -6,20 +6,41 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api.router import api_router
+from .api.routes import metrics
 from .core.config import get_settings
 from .core.db import lifespan as db_lifespan
-from .services.scheduler import scheduler
+from .core.metrics import MetricsMiddleware
+from .core.read_routing import ReadYourWritesMiddleware
+from .services.digiseller import digiseller_client
+from .services.events import token_event_sink
+from .services.invoices import invoice_worker
+from .services.jobs import job_runner
+from .services.scheduler import leader_election, scheduler
+from .services.webhooks import webhook_inbox_worker
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
     async with db_lifespan(None):
+        await token_event_sink.start()
+        await digiseller_client.start()
+        await invoice_worker.start()
+        await webhook_inbox_worker.start()
         if settings.scheduler_enabled:
-            scheduler.start()
+            if settings.scheduler_leader_election:
+                await leader_election.start()
+            else:
+                scheduler.start()
         yield
         if settings.scheduler_enabled:
+            await leader_election.stop()
             await scheduler.shutdown()
+        await job_runner.stop()
+        await webhook_inbox_worker.stop()
+        await invoice_worker.stop()
+        await token_event_sink.stop()
+        await digiseller_client.close()
 
 
 def create_app() -> FastAPI:
@@ -34,6 +55,14 @@ def create_app() -> FastAPI:
         allow_headers=settings.cors_allow_headers,
     )
 
+    if settings.database_replica_url:
+        application.add_middleware(ReadYourWritesMiddleware)
+
+    if settings.metrics_enabled:
+        # Added last so it is outermost and times the whole stack.
+        application.add_middleware(MetricsMiddleware)
+        application.include_router(metrics.router)
+
     application.include_router(api_router, prefix=settings.api_prefix)
 
     @application.get("/")
@@ -1,8 +1,14 @@
+from .archive import PurchaseSessionArchive, TokenEventArchive
 from .base import Base
+from .broadcast import Broadcast
 from .file_asset import FileAsset
+from .invoice import PreparedInvoice
+from .job import DailyPurchaseStats, JobRun
+from .notification import PurchaseNotification
 from .product import Product, ProductVariant
 from .purchase import PurchaseSession, TokenEvent
 from .user import User
+from .webhook import WebhookInbox
 
 __all__ = [
     "Base",
@@ -12,4 +18,12 @@ __all__ = [
     "PurchaseSession",
     "TokenEvent",
     "FileAsset",
+    "Broadcast",
+    "PreparedInvoice",
+    "JobRun",
+    "DailyPurchaseStats",
+    "PurchaseNotification",
+    "PurchaseSessionArchive",
+    "TokenEventArchive",
+    "WebhookInbox",
 ]
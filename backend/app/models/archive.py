@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class PurchaseSessionArchive(Base):
+    """Cold copy of purchase_sessions, range-partitioned by month of archival."""
+
+    __tablename__ = "purchase_sessions_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (archived_at)"}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    user_id: Mapped[int | None] = mapped_column(Integer)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    variant_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    digiseller_order_id: Mapped[str | None] = mapped_column(String(120), index=True)
+    invoice_url: Mapped[str | None] = mapped_column(String(512))
+    token: Mapped[str | None] = mapped_column(String(128))
+    domain_type: Mapped[str | None] = mapped_column(String(50))
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    extra: Mapped[dict | None] = mapped_column("metadata", JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class TokenEventArchive(Base):
+    __tablename__ = "token_events_archive"
+    __table_args__ = {"postgresql_partition_by": "RANGE (archived_at)"}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    purchase_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    event_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    payload: Mapped[dict | None] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
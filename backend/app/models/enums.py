@@ -19,3 +19,9 @@ class TokenEventType(str, Enum):
     EXPIRED = "expired"
     FAILED = "failed"
 
+
+class BroadcastStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class PreparedInvoice(Base):
+    """Digiseller invoice created ahead of time and handed to the next purchase of its variant."""
+
+    __tablename__ = "prepared_invoices"
+    __table_args__ = (
+        Index(
+            "ix_prepared_invoices_available",
+            "variant_id",
+            "id",
+            postgresql_where=text("claimed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    variant_id: Mapped[int] = mapped_column(ForeignKey("product_variants.id", ondelete="CASCADE"), nullable=False)
+    digiseller_order_id: Mapped[str] = mapped_column(String(120), nullable=False)
+    invoice_url: Mapped[str] = mapped_column(String(512), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    purchase_id: Mapped[int | None] = mapped_column(ForeignKey("purchase_sessions.id", ondelete="SET NULL"))
@@ -24,6 +24,13 @@ class PurchaseSession(Base, TimestampMixin):
             unique=True,
             postgresql_where=text("token IS NOT NULL"),
         ),
+        Index("ix_purchase_sessions_created_at_id", "created_at", "id"),
+        Index(
+            "ix_purchase_sessions_expires_at_live",
+            "expires_at",
+            postgresql_where=text("expires_at IS NOT NULL AND status <> 'expired'"),
+        ),
+        Index("ix_purchase_sessions_pending", "id", postgresql_where=text("status = 'pending'")),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -50,7 +57,9 @@ class TokenEvent(Base):
     __tablename__ = "token_events"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    purchase_id: Mapped[int] = mapped_column(ForeignKey("purchase_sessions.id", ondelete="CASCADE"), nullable=False)
+    purchase_id: Mapped[int] = mapped_column(
+        ForeignKey("purchase_sessions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     event_type: Mapped[str] = mapped_column(String(32), nullable=False)
     payload: Mapped[dict | None] = mapped_column(JSONB, default=dict)
     created_at: Mapped[datetime] = mapped_column(
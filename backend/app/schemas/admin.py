@@ -101,10 +101,15 @@ class FileAssetOut(BaseModel):
 class PurchaseListFilters(BaseModel):
     status: str | None = None
     product_type: str | None = None
+    telegram_id: int | None = None
+    digiseller_order_id: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
 
 
 class PurchaseListResponse(BaseModel):
     items: list[PurchaseWithProductOut]
+    next_cursor: str | None = None
 
 
 class ProductListResponse(BaseModel):
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .common import ORMModel
+
+
+class BroadcastCreate(BaseModel):
+    text: str = Field(min_length=1, max_length=4096)
+
+
+class BroadcastOut(ORMModel):
+    id: int
+    text: str
+    status: str
+    total: int
+    sent: int
+    failed: int
+    last_user_id: int
+    started_at: datetime | None
+    finished_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class BroadcastClaim(BroadcastOut):
+    claim_token: str
+
+
+class BroadcastProgress(BaseModel):
+    claim_token: str
+    last_user_id: int
+    sent: int = Field(ge=0, description="Running total, so a repeated checkpoint is harmless.")
+    failed: int = Field(ge=0)
+    done: bool = False
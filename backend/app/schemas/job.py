@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from .common import ORMModel
+
+
+class JobRunOut(ORMModel):
+    id: int
+    job_name: str
+    trigger: str
+    status: str
+    started_at: datetime
+    finished_at: datetime | None
+    duration_ms: int | None
+    rows_touched: int | None
+    error: str | None
+
+
+class JobOut(BaseModel):
+    name: str
+    description: str
+    enabled: bool
+    schedule: str
+    max_runtime_seconds: int
+    next_run_at: datetime | None = None
+    running: bool = False
+    stale: bool = False
+    last_run: JobRunOut | None = None
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .common import ORMModel
+
+
+class NotificationOut(ORMModel):
+    id: int
+    purchase_id: int | None
+    telegram_id: int
+    event: str
+    payload: dict[str, Any]
+    created_at: datetime
+
+
+class NotificationAck(BaseModel):
+    ids: list[int] = Field(max_length=500)
@@ -34,6 +34,15 @@ class PurchaseSessionOut(ORMModel):
 class PurchaseCreateResponse(BaseModel):
     purchase: PurchaseSessionOut
     payment_url: str | None
+    invoice_pending: bool = False
+
+
+class PurchaseStatusOut(BaseModel):
+    id: int
+    status: str
+    payment_url: str | None
+    invoice_pending: bool
+    error: str | None = None
 
 
 class PurchaseWithProductOut(PurchaseSessionOut):
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+
+from app.core.config import get_settings
+
+APP = "app.main:app"
+
+
+def worker_count(configured: int) -> int:
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def main() -> None:
+    settings = get_settings()
+    workers = worker_count(settings.web_concurrency)
+    if settings.server_launcher == "gunicorn":
+        args = [
+            "gunicorn",
+            APP,
+            "--worker-class",
+            "uvicorn.workers.UvicornWorker",
+            "--workers",
+            str(workers),
+            "--bind",
+            f"{settings.backend_host}:{settings.backend_port}",
+            "--graceful-timeout",
+            str(settings.server_graceful_timeout),
+        ]
+        if settings.server_max_requests:
+            jitter = settings.server_max_requests // 10
+            args += ["--max-requests", str(settings.server_max_requests), "--max-requests-jitter", str(jitter)]
+        os.execvp("gunicorn", args)
+
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=settings.backend_host,
+        port=settings.backend_port,
+        workers=workers,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        log_level=settings.log_level.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.config import Settings, get_settings
+from ..models import Broadcast, User
+from ..models.enums import BroadcastStatus
+from ..schemas.broadcast import BroadcastProgress
+
+ACTIVE_STATUSES = (BroadcastStatus.PENDING.value, BroadcastStatus.RUNNING.value)
+# Returned by record_progress when another sender has claimed the broadcast since.
+CLAIM_LOST = "lost"
+
+
+async def create_broadcast(session: AsyncSession, text: str) -> Broadcast:
+    broadcast = Broadcast(
+        text=text,
+        status=BroadcastStatus.PENDING.value,
+        total=await session.scalar(select(func.count()).select_from(User)) or 0,
+    )
+    session.add(broadcast)
+    await session.flush()
+    return broadcast
+
+
+async def claim_broadcast(session: AsyncSession, settings: Settings | None = None) -> Broadcast | None:
+    """Lease the oldest unfinished broadcast whose previous sender has gone quiet.
+
+    Only one bot replica sends a broadcast at a time; the lease is renewed
+    with every checkpoint. Each claim gets a fresh ``claim_token``, so a sender
+    whose lease lapsed is told to stop at its next checkpoint.
+    """
+    settings = settings or get_settings()
+    now = datetime.now(timezone.utc)
+    candidate = (
+        select(Broadcast.id)
+        .where(
+            Broadcast.status.in_(ACTIVE_STATUSES),
+            (Broadcast.claimed_until.is_(None)) | (Broadcast.claimed_until < now),
+        )
+        .order_by(Broadcast.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return await session.scalar(
+        update(Broadcast)
+        .where(Broadcast.id == candidate)
+        .values(
+            status=BroadcastStatus.RUNNING.value,
+            claimed_until=now + timedelta(seconds=settings.broadcast_lease_seconds),
+            claim_token=secrets.token_hex(16),
+            started_at=func.coalesce(Broadcast.started_at, now),
+        )
+        .returning(Broadcast)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def record_progress(
+    session: AsyncSession, broadcast_id: int, progress: BroadcastProgress, settings: Settings | None = None
+) -> str | None:
+    """Store a checkpoint and renew the lease.
+
+    Returns the broadcast status, ``CLAIM_LOST`` if the caller no longer holds
+    the claim, or ``None`` if the broadcast is gone.
+    """
+    settings = settings or get_settings()
+    now = datetime.now(timezone.utc)
+    values = {
+        "last_user_id": func.greatest(Broadcast.last_user_id, progress.last_user_id),
+        "sent": func.greatest(Broadcast.sent, progress.sent),
+        "failed": func.greatest(Broadcast.failed, progress.failed),
+        "claimed_until": now + timedelta(seconds=settings.broadcast_lease_seconds),
+    }
+    if progress.done:
+        values |= {"status": BroadcastStatus.COMPLETED.value, "finished_at": now, "claimed_until": None, "claim_token": None}
+    updated = await session.scalar(
+        update(Broadcast)
+        .where(
+            Broadcast.id == broadcast_id,
+            Broadcast.status == BroadcastStatus.RUNNING.value,
+            Broadcast.claim_token == progress.claim_token,
+        )
+        .values(**values)
+        .returning(Broadcast.status)
+        .execution_options(synchronize_session=False)
+    )
+    if updated is not None:
+        return updated
+    current = await session.scalar(select(Broadcast.status).where(Broadcast.id == broadcast_id))
+    # Still running, so some other sender holds it now.
+    return CLAIM_LOST if current == BroadcastStatus.RUNNING.value else current
+
+
+async def stream_recipients(
+    session_factory: async_sessionmaker, after_user_id: int, limit: int, chunk_size: int = 1000
+) -> AsyncIterator[tuple[int, int]]:
+    """Yield ``(user_id, telegram_id)`` past the checkpoint in id order.
+
+    Rows come from a server-side cursor ``chunk_size`` at a time, so memory
+    stays flat however many users there are.
+    """
+    stmt = (
+        select(User.id, User.telegram_id)
+        .where(User.id > after_user_id)
+        .order_by(User.id)
+        .limit(limit)
+        .execution_options(yield_per=chunk_size)
+    )
+    async with session_factory() as session:
+        result = await session.stream(stmt)
+        async for user_id, telegram_id in result:
+            yield user_id, telegram_id
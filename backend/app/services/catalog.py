@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..core.caching import body_etag
+from ..core.config import get_settings
+from ..models import FileAsset, Product
+from ..schemas.product import ProductOut
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_data(cls, data: object) -> "CachedBody":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body=body, etag=body_etag(body))
+
+
+EMPTY_LISTING = CachedBody.from_data({"items": []})
+
+
+@dataclass
+class CatalogSnapshot:
+    version: int
+    loaded_at: float
+    products: dict[int, CachedBody] = field(default_factory=dict)
+    listings: dict[str | None, CachedBody] = field(default_factory=dict)
+
+
+class CatalogCache:
+    """Pre-serialized snapshot of active products, rebuilt after admin edits."""
+
+    def __init__(self, ttl_seconds: int | None = None):
+        settings = get_settings()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.catalog_cache_ttl_seconds
+        self.settle_seconds = settings.db_read_your_writes_seconds if settings.database_replica_url else 0
+        self.version = 0
+        self.invalidated_at = float("-inf")
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.invalidated_at = time.monotonic()
+        self._snapshot = None
+
+    def _is_fresh(self, snapshot: CatalogSnapshot | None) -> bool:
+        if snapshot is None or snapshot.version != self.version:
+            return False
+        # Built from a replica right after an edit, it may predate the edit: rebuild once the replica caught up.
+        now = time.monotonic()
+        if snapshot.loaded_at - self.invalidated_at < self.settle_seconds <= now - self.invalidated_at:
+            return False
+        if self.ttl_seconds <= 0:
+            return True
+        return now - snapshot.loaded_at < self.ttl_seconds
+
+    async def snapshot(self, session: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+            version = self.version
+            built = await self._build(session, version)
+            if version == self.version:
+                self._snapshot = built
+            return built
+
+    async def listing(self, session: AsyncSession, product_type: str | None = None) -> CachedBody:
+        return (await self.snapshot(session)).listings.get(product_type) or EMPTY_LISTING
+
+    async def product(self, session: AsyncSession, product_id: int) -> CachedBody | None:
+        return (await self.snapshot(session)).products.get(product_id)
+
+    async def _build(self, session: AsyncSession, version: int) -> CatalogSnapshot:
+        stmt = (
+            select(Product)
+            .options(selectinload(Product.variants))
+            .where(Product.is_active.is_(True))
+            .order_by(Product.type, Product.id)
+        )
+        result = await session.execute(stmt)
+        products = result.scalars().unique().all()
+
+        snapshot = CatalogSnapshot(version=version, loaded_at=time.monotonic())
+        by_type: dict[str | None, list[dict]] = {None: []}
+        for product in products:
+            data = ProductOut.model_validate(product).model_dump(mode="json", by_alias=True)
+            snapshot.products[product.id] = CachedBody.from_data(data)
+            by_type[None].append(data)
+            by_type.setdefault(product.type, []).append(data)
+
+        for product_type, items in by_type.items():
+            snapshot.listings[product_type] = CachedBody.from_data({"items": items})
+        return snapshot
+
+
+catalog_cache = CatalogCache()
+
+
+class FileAssetCache:
+    """Download entries (label and path) per product type, dropped on admin file edits."""
+
+    def __init__(self, ttl_seconds: int | None = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else get_settings().catalog_cache_ttl_seconds
+        self._entries: dict[str, tuple[float, list[tuple[str, str]]]] = {}
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def for_type(self, session: AsyncSession, product_type: str) -> list[tuple[str, str]]:
+        entry = self._entries.get(product_type)
+        if entry is not None and (self.ttl_seconds <= 0 or time.monotonic() - entry[0] < self.ttl_seconds):
+            return entry[1]
+        result = await session.execute(
+            select(FileAsset.label, FileAsset.path).where(FileAsset.product_type == product_type).order_by(FileAsset.id)
+        )
+        assets = [(label, path) for label, path in result.all()]
+        self._entries[product_type] = (time.monotonic(), assets)
+        return assets
+
+
+file_assets_cache = FileAssetCache()
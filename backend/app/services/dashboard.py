@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..models import Product, PurchaseSession, User
+from ..models.enums import PurchaseStatus
+from ..schemas.admin import AdminSummary
+
+
+def summary_statement():
+    """All dashboard counters in one round-trip: one scan per table, FILTER per counter."""
+    users = select(func.count(User.id).label("users_total")).subquery()
+    products = select(
+        func.count(Product.id).label("products_total"),
+        func.count(Product.id).filter(Product.is_active.is_(True)).label("active_products"),
+    ).subquery()
+    purchases = select(
+        func.count(PurchaseSession.id).label("purchases_total"),
+        func.count(PurchaseSession.id)
+        .filter(PurchaseSession.status == PurchaseStatus.PENDING.value)
+        .label("purchases_pending"),
+        func.count(PurchaseSession.id)
+        .filter(PurchaseSession.status == PurchaseStatus.PAID.value)
+        .label("purchases_paid"),
+        func.count(PurchaseSession.id)
+        .filter(PurchaseSession.status == PurchaseStatus.DELIVERED.value)
+        .label("purchases_delivered"),
+        func.count(PurchaseSession.id)
+        .filter(
+            PurchaseSession.token.is_not(None),
+            PurchaseSession.status.in_([PurchaseStatus.PAID.value, PurchaseStatus.DELIVERED.value]),
+        )
+        .label("tokens_active"),
+    ).subquery()
+    # Each side is a single aggregate row; joining ON true keeps that one row without an implicit cartesian FROM.
+    return select(users, products, purchases).select_from(users.join(products, true()).join(purchases, true()))
+
+
+async def fetch_summary(session: AsyncSession) -> AdminSummary:
+    row = (await session.execute(summary_statement())).one()
+    return AdminSummary(**row._mapping)
+
+
+class DashboardCache:
+    """Keeps the last summary for a few seconds so SPA polling does not rescan purchases."""
+
+    def __init__(self, ttl_seconds: int | None = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else get_settings().admin_summary_cache_ttl_seconds
+        self._summary: AdminSummary | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._summary = None
+
+    def _is_fresh(self) -> bool:
+        return self._summary is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def summary(self, session: AsyncSession) -> AdminSummary:
+        if self.ttl_seconds <= 0:
+            return await fetch_summary(session)
+        if self._is_fresh():
+            return self._summary
+        async with self._lock:
+            if not self._is_fresh():
+                self._summary = await fetch_summary(session)
+                self._loaded_at = time.monotonic()
+            return self._summary
+
+
+dashboard_cache = DashboardCache()
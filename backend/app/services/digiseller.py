@@ -1,14 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
+import logging
+import random
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import httpx
 
 from ..core.config import Settings, get_settings
+from ..core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+DIGISELLER_LATENCY = Histogram(
+    "okak_digiseller_request_duration_seconds",
+    "Digiseller API latency per attempt.",
+    ("operation",),
+)
+DIGISELLER_REQUESTS = Counter(
+    "okak_digiseller_requests_total",
+    "Digiseller API attempts by outcome (success, client_error, server_error, transport_error, rejected).",
+    ("operation", "outcome"),
+)
 
 
 @dataclass
@@ -18,21 +36,130 @@ class InvoiceResult:
     payload: dict[str, Any]
 
 
+class DigisellerUnavailable(RuntimeError):
+    """Raised without calling Digiseller while the circuit breaker is open."""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Whether a failed call may succeed later: open breaker, network errors, 5xx and 429."""
+    if isinstance(exc, (DigisellerUnavailable, httpx.TransportError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return False
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; ``reset_seconds`` later it is half-open.
+
+    Half-open, a single probe call goes through while every other call is still
+    rejected. The probe's success closes the breaker and its failure re-opens
+    it; a probe that never reports back is replaced after another ``reset_seconds``.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probe_started_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def check(self) -> None:
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_seconds:
+            raise DigisellerUnavailable("Digiseller circuit breaker is open")
+        if self.probe_started_at is not None and now - self.probe_started_at < self.reset_seconds:
+            raise DigisellerUnavailable("Digiseller circuit breaker is half-open; a probe call is in flight")
+        self.probe_started_at = now
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.threshold > 0 and self.failures >= self.threshold:
+            if not self.is_open:
+                logger.warning("Digiseller circuit breaker opened after %s failures", self.failures)
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+
 class DigisellerClient:
     def __init__(self, settings: Settings | None = None):
         self.settings = settings or get_settings()
         self._client: httpx.AsyncClient | None = None
+        self.breaker = CircuitBreaker(
+            threshold=self.settings.digiseller_breaker_threshold,
+            reset_seconds=self.settings.digiseller_breaker_reset_seconds,
+        )
 
     async def _client_instance(self) -> httpx.AsyncClient:
         if not self._client:
-            self._client = httpx.AsyncClient(base_url=self.settings.digiseller_base_url.unicode_string(), timeout=15.0)
+            self._client = httpx.AsyncClient(
+                base_url=self.settings.digiseller_base_url.unicode_string(),
+                timeout=httpx.Timeout(self.settings.digiseller_timeout, connect=self.settings.digiseller_connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.settings.digiseller_max_connections,
+                    max_keepalive_connections=self.settings.digiseller_max_keepalive_connections,
+                ),
+            )
         return self._client
 
+    async def start(self) -> None:
+        await self._client_instance()
+
     async def close(self) -> None:
         if self._client:
             await self._client.aclose()
             self._client = None
 
+    async def _request(self, method: str, url: str, *, operation: str, idempotent: bool, **kwargs: Any) -> httpx.Response:
+        """Send a request through the breaker, retrying with jittered exponential backoff.
+
+        Non-idempotent calls are only retried when the connection failed before
+        anything was sent.
+        """
+        latency = DIGISELLER_LATENCY.labels(operation)
+        try:
+            self.breaker.check()
+        except DigisellerUnavailable:
+            DIGISELLER_REQUESTS.labels(operation, "rejected").inc()
+            raise
+        client = await self._client_instance()
+        attempts = self.settings.digiseller_retries + 1
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=self._headers(), **kwargs)
+            except httpx.TransportError as exc:
+                latency.observe(time.perf_counter() - started)
+                DIGISELLER_REQUESTS.labels(operation, "transport_error").inc()
+                self.breaker.record_failure()
+                retryable = idempotent or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if not retryable or attempt + 1 >= attempts or self.breaker.is_open:
+                    raise
+            else:
+                latency.observe(time.perf_counter() - started)
+                if response.status_code < 500:
+                    outcome = "success" if response.status_code < 400 else "client_error"
+                    DIGISELLER_REQUESTS.labels(operation, outcome).inc()
+                    self.breaker.record_success()
+                    return response
+                DIGISELLER_REQUESTS.labels(operation, "server_error").inc()
+                self.breaker.record_failure()
+                if not idempotent or attempt + 1 >= attempts or self.breaker.is_open:
+                    return response
+            await asyncio.sleep(random.uniform(0, self.settings.digiseller_retry_backoff * 2**attempt))
+        raise AssertionError("unreachable")  # pragma: no cover
+
     async def create_invoice(self, product_id: str, quantity: int = 1) -> InvoiceResult:
         if not self.settings.digiseller_api_key or not self.settings.digiseller_seller_id:
             raise RuntimeError("Digiseller credentials are not configured")
@@ -43,8 +170,9 @@ class DigisellerClient:
             "quantity": quantity,
         }
 
-        client = await self._client_instance()
-        response = await client.post("/api/purchases", json=payload, headers=self._headers())
+        response = await self._request(
+            "POST", "/api/purchases", operation="create_invoice", idempotent=False, json=payload
+        )
         response.raise_for_status()
         data = response.json()
         order_id = str(data.get("order_id") or data.get("invoice_id") or "")
@@ -57,8 +185,7 @@ class DigisellerClient:
         if not self.settings.digiseller_api_key or not self.settings.digiseller_seller_id:
             raise RuntimeError("Digiseller credentials are not configured")
 
-        client = await self._client_instance()
-        response = await client.get(f"/api/purchases/{order_id}", headers=self._headers())
+        response = await self._request("GET", f"/api/purchases/{order_id}", operation="get_invoice", idempotent=True)
         response.raise_for_status()
         return response.json()
 
@@ -74,5 +201,8 @@ class DigisellerClient:
         }
 
 
+digiseller_client = DigisellerClient()
+
+
 async def get_digiseller_client() -> DigisellerClient:
-    return DigisellerClient()
+    return digiseller_client
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.config import Settings, get_settings
+from ..core.db import AsyncSessionMaker
+from ..core.metrics import Counter
+from ..models import TokenEvent
+from ..models.enums import TokenEventType
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+TOKEN_EVENTS = Counter("okak_token_events_total", "Token lifecycle events (issued, opened, completed, ...).", ("event",))
+_token_event_counters = {event_type: TOKEN_EVENTS.labels(event_type.value) for event_type in TokenEventType}
+
+
+def count_token_event(event_type: TokenEventType) -> None:
+    _token_event_counters[event_type].inc()
+
+
+class TokenEventSink:
+    """Write-behind buffer for token events recorded outside a write transaction.
+
+    In ``buffered`` mode events are queued and a background task writes them with
+    one multi-row INSERT per ``token_event_batch_size`` events or
+    ``token_event_flush_interval_ms``, whichever comes first. ``sync`` mode (and a
+    sink that has not been started) inserts each event immediately.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionMaker, settings: Settings | None = None):
+        self.settings = settings or get_settings()
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.settings.token_event_mode != "buffered" or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.settings.token_event_queue_size)
+        self._task = asyncio.create_task(self._run(), name="token-event-sink")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the background task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def record(self, purchase_id: int, event_type: TokenEventType, payload: dict | None = None) -> None:
+        count_token_event(event_type)
+        row = {
+            "purchase_id": purchase_id,
+            "event_type": event_type.value,
+            "payload": payload or {},
+            "created_at": datetime.now(timezone.utc),
+        }
+        if not self.running:
+            await self._write([row])
+            return
+        # A full queue applies backpressure rather than dropping events.
+        await self._queue.put(row)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.settings.token_event_flush_interval_ms / 1000
+        batch_size = self.settings.token_event_batch_size
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + interval
+            while len(batch) < batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(TokenEvent), rows)
+                await session.commit()
+        except Exception:  # pragma: no cover - keep the sink alive on DB errors
+            logger.exception("Failed to write %s token events", len(rows))
+
+
+token_event_sink = TokenEventSink()
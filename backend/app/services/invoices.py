@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload
+
+from ..core.config import Settings, get_settings
+from ..core.db import AsyncSessionMaker
+from ..models import PreparedInvoice, PurchaseSession
+from ..models.enums import PurchaseStatus
+from .digiseller import DigisellerClient, InvoiceResult, digiseller_client, is_transient_error
+from .notifications import INVOICE_FAILED, INVOICE_READY, publish_purchase_update
+
+logger = logging.getLogger(__name__)
+
+
+def apply_invoice(purchase: PurchaseSession, invoice: InvoiceResult) -> None:
+    purchase.digiseller_order_id = invoice.order_id
+    purchase.invoice_url = invoice.invoice_url
+
+
+async def claim_prepared_invoice(session: AsyncSession, variant_id: int, purchase_id: int) -> InvoiceResult | None:
+    """Take one unused pre-generated invoice for the variant, or ``None`` if the pool is empty.
+
+    The claim happens in the caller's transaction, so it rolls back with the purchase.
+    """
+    now = datetime.now(timezone.utc)
+    candidate = (
+        select(PreparedInvoice.id)
+        .where(
+            PreparedInvoice.variant_id == variant_id,
+            PreparedInvoice.claimed_at.is_(None),
+            PreparedInvoice.expires_at > now,
+        )
+        .order_by(PreparedInvoice.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = (
+        await session.execute(
+            update(PreparedInvoice)
+            .where(PreparedInvoice.id == candidate)
+            .values(claimed_at=now, purchase_id=purchase_id)
+            .returning(PreparedInvoice.digiseller_order_id, PreparedInvoice.invoice_url)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    if row is None:
+        return None
+    return InvoiceResult(order_id=row.digiseller_order_id, invoice_url=row.invoice_url, payload={"prepared": True})
+
+
+def awaiting_invoice():
+    """Purchases that were committed without an invoice and still need one."""
+    return (
+        PurchaseSession.status == PurchaseStatus.PENDING.value,
+        PurchaseSession.invoice_url.is_(None),
+    )
+
+
+class InvoiceWorker:
+    """Creates Digiseller invoices for committed PENDING purchases in the background.
+
+    At most ``invoice_worker_concurrency`` invoices are requested at once, so a
+    slow provider ties up neither API workers nor more than that many DB
+    connections.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionMaker,
+        client: DigisellerClient = digiseller_client,
+        settings: Settings | None = None,
+    ):
+        self.settings = settings or get_settings()
+        self.session_factory = session_factory
+        self.client = client
+        self._queue: asyncio.Queue[int] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def can_accept(self) -> bool:
+        return self.running and not self._queue.full()
+
+    async def start(self) -> None:
+        if self.settings.invoice_mode != "async" or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.settings.invoice_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"invoice-worker-{index}")
+            for index in range(self.settings.invoice_worker_concurrency)
+        ]
+        await self._requeue_unfinished()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, purchase_id: int) -> None:
+        self._queue.put_nowait(purchase_id)
+
+    async def _requeue_unfinished(self) -> None:
+        """Pick up purchases a previous process accepted but never invoiced."""
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.settings.invoice_recovery_window_seconds)
+        async with self.session_factory() as session:
+            result = await session.scalars(
+                select(PurchaseSession.id)
+                .where(*awaiting_invoice(), PurchaseSession.created_at >= since)
+                .order_by(PurchaseSession.id)
+                .limit(self.settings.invoice_queue_size)
+            )
+            for purchase_id in result.all():
+                self._queue.put_nowait(purchase_id)
+
+    def _retry_later(self, purchase_id: int, attempts: int) -> None:
+        delay = self.settings.invoice_retry_backoff_seconds * 2 ** (attempts - 1)
+        asyncio.get_running_loop().call_later(delay, self._requeue, purchase_id)
+
+    def _requeue(self, purchase_id: int) -> None:
+        if self.can_accept():
+            self.enqueue(purchase_id)
+
+    async def _run(self) -> None:
+        while True:
+            purchase_id = await self._queue.get()
+            try:
+                await self.process(purchase_id)
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Invoice creation failed for purchase %s", purchase_id)
+
+    async def process(self, purchase_id: int) -> None:
+        async with self.session_factory() as session:
+            # SKIP LOCKED lets several processes drain the same backlog without double invoicing.
+            purchase = await session.scalar(
+                select(PurchaseSession)
+                .options(joinedload(PurchaseSession.variant, innerjoin=True))
+                .where(PurchaseSession.id == purchase_id, *awaiting_invoice())
+                .with_for_update(of=PurchaseSession, skip_locked=True)
+            )
+            if purchase is None or not purchase.variant.digiseller_product_id:
+                return
+            try:
+                invoice = await self.client.create_invoice(purchase.variant.digiseller_product_id)
+            except Exception as exc:
+                error = str(exc) or exc.__class__.__name__
+                attempts = int((purchase.extra or {}).get("invoice_attempts", 0)) + 1
+                if is_transient_error(exc) and attempts < self.settings.invoice_retry_attempts:
+                    # Still PENDING without an invoice: retried here, or re-queued by the next startup.
+                    purchase.extra = (purchase.extra or {}) | {"invoice_attempts": attempts, "invoice_error": error}
+                    await session.commit()
+                    self._retry_later(purchase_id, attempts)
+                    logger.warning("Invoice for purchase %s failed transiently (attempt %s): %s", purchase_id, attempts, error)
+                    return
+                purchase.status = PurchaseStatus.FAILED.value
+                purchase.extra = (purchase.extra or {}) | {"invoice_attempts": attempts, "invoice_error": error}
+                await publish_purchase_update(session, purchase, INVOICE_FAILED, settings=self.settings)
+                await session.commit()
+                raise
+            apply_invoice(purchase, invoice)
+            await publish_purchase_update(
+                session, purchase, INVOICE_READY, settings=self.settings, payment_url=invoice.invoice_url
+            )
+            await session.commit()
+
+
+invoice_worker = InvoiceWorker()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import zlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from ..core.config import Settings, get_settings
+from ..core.db import AsyncSessionMaker, build_lock_engine
+from ..core.metrics import JOB_BUCKETS, Counter, Gauge, Histogram
+from ..jobs.registry import JOBS, JobSpec
+from ..models import JobRun
+
+logger = logging.getLogger(__name__)
+
+# First half of the two-key advisory lock; the second is derived from the job name.
+JOB_LOCK_NAMESPACE = 0x6F6B6A62
+
+STATUS_RUNNING = "running"
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_SKIPPED = "skipped"
+STATUS_CANCELLED = "cancelled"
+# A "running" row left behind by a worker that died mid-run.
+STATUS_ABANDONED = "abandoned"
+
+TRIGGER_SCHEDULE = "schedule"
+TRIGGER_MANUAL = "manual"
+
+JOB_DURATION = Histogram("okak_job_duration_seconds", "Maintenance job run time.", ("job",), buckets=JOB_BUCKETS)
+JOB_RUNS = Counter("okak_job_runs_total", "Maintenance job runs by final status.", ("job", "status"))
+JOB_IN_PROGRESS = Gauge("okak_job_in_progress", "Maintenance jobs running in this process.", ("job",))
+
+
+def job_lock_key(name: str) -> int:
+    return zlib.crc32(name.encode()) & 0x7FFFFFFF
+
+
+# Two-int4 advisory locks show up in pg_locks as (classid, objid) with objsubid = 2.
+HELD_JOB_LOCKS_SQL = text(
+    "SELECT objid FROM pg_locks WHERE locktype = 'advisory' AND granted AND objsubid = 2 AND classid = :namespace"
+)
+
+
+class JobRunner:
+    """Runs registered jobs with an overlap lock, a runtime limit and a ``job_runs`` row per run.
+
+    The lock is a Postgres advisory lock, so a manual run and a scheduled one
+    never overlap even when they land in different workers; the loser is
+    recorded as ``skipped``.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionMaker, settings: Settings | None = None):
+        self.session_factory = session_factory
+        self.settings = settings or get_settings()
+        self._lock_engine: AsyncEngine | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def max_runtime(self, name: str) -> int:
+        return self.settings.job_max_runtime_overrides.get(name, self.settings.job_max_runtime_seconds)
+
+    @asynccontextmanager
+    async def _lock(self, name: str) -> AsyncIterator[bool]:
+        if self._lock_engine is None:
+            self._lock_engine = build_lock_engine(self.settings)
+        params = {"namespace": JOB_LOCK_NAMESPACE, "key": job_lock_key(name)}
+        async with self._lock_engine.connect() as connection:
+            acquired = await connection.scalar(text("SELECT pg_try_advisory_lock(:namespace, :key)"), params)
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    await connection.execute(text("SELECT pg_advisory_unlock(:namespace, :key)"), params)
+
+    async def _record(self, run: JobRun) -> JobRun:
+        async with self.session_factory() as session:
+            run = await session.merge(run)
+            await session.commit()
+        return run
+
+    async def held_locks(self, session: AsyncSession) -> set[str]:
+        """Names of jobs whose lock some process holds right now, i.e. that are really running."""
+        result = await session.execute(HELD_JOB_LOCKS_SQL, {"namespace": JOB_LOCK_NAMESPACE})
+        keys = {int(objid) for objid in result.scalars()}
+        return {name for name in JOBS if job_lock_key(name) in keys}
+
+    async def _abandon_leftovers(self, name: str) -> None:
+        # Only called under the job's lock, so no other "running" row of this job can be live.
+        async with self.session_factory() as session:
+            await session.execute(
+                update(JobRun)
+                .where(JobRun.job_name == name, JobRun.status == STATUS_RUNNING)
+                .values(status=STATUS_ABANDONED, finished_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+
+    async def run(self, name: str, trigger: str = TRIGGER_SCHEDULE) -> JobRun:
+        spec: JobSpec = JOBS[name]
+        async with self._lock(name) as acquired:
+            if not acquired:
+                now = datetime.now(timezone.utc)
+                logger.info("Job %s is already running elsewhere; skipped", name)
+                JOB_RUNS.labels(name, STATUS_SKIPPED).inc()
+                return await self._record(
+                    JobRun(job_name=name, trigger=trigger, status=STATUS_SKIPPED, started_at=now, finished_at=now, duration_ms=0)
+                )
+
+            await self._abandon_leftovers(name)
+            run = await self._record(JobRun(job_name=name, trigger=trigger, status=STATUS_RUNNING))
+            in_progress = JOB_IN_PROGRESS.labels(name)
+            in_progress.inc()
+            started = time.perf_counter()
+            limit = self.max_runtime(name)
+            try:
+                result = await asyncio.wait_for(spec.run(), timeout=limit)
+                run.rows_touched = spec.rows_touched(result)
+                run.status = STATUS_SUCCESS
+            except asyncio.TimeoutError:
+                run.status = STATUS_TIMEOUT
+                run.error = f"Cancelled after {limit}s"
+                logger.error("Job %s exceeded its %ss runtime limit", name, limit)
+            except asyncio.CancelledError:
+                run.status = STATUS_CANCELLED
+                run.error = "Cancelled (worker shutting down)"
+                # Shielded so a second cancel does not leave the row "running".
+                await asyncio.shield(self._finish(run, started))
+                raise
+            except Exception as exc:
+                run.status = STATUS_FAILED
+                run.error = f"{type(exc).__name__}: {exc}"[:2000]
+                logger.exception("Job %s failed", name)
+            finally:
+                in_progress.dec()
+            run = await self._finish(run, started)
+
+        if run.status == STATUS_SUCCESS and run.rows_touched:
+            logger.info("Job %s touched %s rows in %sms", name, run.rows_touched, run.duration_ms)
+        return run
+
+    async def _finish(self, run: JobRun, started: float) -> JobRun:
+        elapsed = time.perf_counter() - started
+        JOB_DURATION.labels(run.job_name).observe(elapsed)
+        JOB_RUNS.labels(run.job_name, run.status).inc()
+        run.duration_ms = int(elapsed * 1000)
+        run.finished_at = datetime.now(timezone.utc)
+        return await self._record(run)
+
+    def trigger(self, name: str) -> None:
+        """Start a manual run in the background of this process."""
+        task = asyncio.create_task(self.run(name, TRIGGER_MANUAL), name=f"job-{name}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._lock_engine is not None:
+            await self._lock_engine.dispose()
+            self._lock_engine = None
+
+
+job_runner = JobRunner()
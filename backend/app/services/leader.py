@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..core.config import Settings, get_settings
+from ..core.db import build_lock_engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock ("okak").
+LEADER_LOCK_KEY = 0x6F6B616B
+
+
+class LeaderElection:
+    """Elects one process out of all API workers and replicas via a Postgres advisory lock.
+
+    The lock is session-level and lives on a dedicated connection: it is held
+    for as long as that connection is, and Postgres releases it if the process
+    dies. Every ``leader_check_seconds`` a follower retries the lock and the
+    leader checks that its connection is still alive.
+    """
+
+    def __init__(
+        self,
+        on_elected: Callable[[], None],
+        on_lost: Callable[[], None],
+        settings: Settings | None = None,
+        key: int = LEADER_LOCK_KEY,
+    ):
+        self.settings = settings or get_settings()
+        self.on_elected = on_elected
+        self.on_lost = on_lost
+        self.key = key
+        self._engine: AsyncEngine | None = None
+        self._connection: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._engine = build_lock_engine(self.settings)
+        await self._attempt()
+        self._task = asyncio.create_task(self._run(), name="leader-election")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._release()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.leader_check_seconds)
+            await self._attempt()
+
+    async def _attempt(self) -> None:
+        if self._connection is not None:
+            try:
+                await self._connection.scalar(text("SELECT 1"))
+                return
+            except Exception:
+                logger.warning("Leader connection lost; stepping down")
+                await self._release()
+        connection = None
+        try:
+            connection = await self._engine.connect()
+            acquired = await connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+        except Exception:
+            logger.exception("Leader election attempt failed")
+            acquired = False
+        if not acquired:
+            if connection is not None:
+                await connection.close()
+            return
+        self._connection = connection
+        logger.info("Elected leader; running scheduled jobs in this process")
+        self.on_elected()
+
+    async def _release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        self.on_lost()
+        try:
+            await connection.close()
+        except Exception:  # the lock dies with the session anyway
+            logger.debug("Closing leader connection failed", exc_info=True)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import Settings, get_settings
+from ..models import PurchaseNotification, PurchaseSession, User
+from .tokens import TokenManager
+
+# Events the bot understands; anything else is delivered as a plain status update.
+INVOICE_READY = "invoice_ready"
+INVOICE_FAILED = "invoice_failed"
+STATUS_CHANGED = "status_changed"
+
+
+async def publish_purchase_update(
+    session: AsyncSession,
+    purchase: PurchaseSession,
+    event: str = STATUS_CHANGED,
+    *,
+    product_type: str | None = None,
+    settings: Settings | None = None,
+    **payload: Any,
+) -> None:
+    """Queue a notification for the purchase owner in the caller's transaction.
+
+    The row only becomes visible to the bot once the status change itself
+    commits, and disappears with it on rollback. Anonymous purchases are skipped.
+    Pass ``product_type`` to include the token link while the purchase has one.
+    """
+    settings = settings or get_settings()
+    if not settings.notifications_enabled or purchase.user_id is None:
+        return
+    body = {"status": purchase.status, "purchase_id": purchase.id} | payload
+    if purchase.token and product_type:
+        manager = TokenManager(settings)
+        domain = manager.domain_for_type(purchase.domain_type or product_type)
+        body["token_url"] = manager.build_link(domain, purchase.token)
+        body["expires_at"] = purchase.expires_at.isoformat() if purchase.expires_at else None
+    telegram_id = select(User.telegram_id).where(User.id == purchase.user_id).scalar_subquery()
+    await session.execute(
+        insert(PurchaseNotification).values(
+            purchase_id=purchase.id,
+            telegram_id=telegram_id,
+            event=event,
+            payload=body,
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+async def claim_notifications(session: AsyncSession, limit: int, settings: Settings | None = None) -> list[PurchaseNotification]:
+    """Lease up to ``limit`` undelivered notifications to the calling consumer.
+
+    Leased rows are hidden from other consumers until acknowledged or until
+    ``notifications_lease_seconds`` pass, so several bot replicas can poll at once.
+    """
+    settings = settings or get_settings()
+    now = datetime.now(timezone.utc)
+    candidates = (
+        select(PurchaseNotification.id)
+        .where(
+            PurchaseNotification.delivered_at.is_(None),
+            (PurchaseNotification.claimed_until.is_(None)) | (PurchaseNotification.claimed_until < now),
+        )
+        .order_by(PurchaseNotification.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.scalars(
+        update(PurchaseNotification)
+        .where(PurchaseNotification.id.in_(candidates))
+        .values(claimed_until=now + timedelta(seconds=settings.notifications_lease_seconds))
+        .returning(PurchaseNotification)
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(result.all(), key=lambda row: row.id)
+
+
+async def acknowledge_notifications(session: AsyncSession, ids: list[int]) -> int:
+    if not ids:
+        return 0
+    result = await session.execute(
+        update(PurchaseNotification)
+        .where(PurchaseNotification.id.in_(ids), PurchaseNotification.delivered_at.is_(None))
+        .values(delivered_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+from ..models import PurchaseSession
+from ..schemas.purchase import PurchaseWithProductOut
+from .tokens import TokenManager
+
+
+def purchase_with_product(item: PurchaseSession, manager: TokenManager) -> PurchaseWithProductOut:
+    """Flatten a purchase with its loaded product and variant into the listing schema."""
+    token_url = None
+    if item.token:
+        domain = manager.domain_for_type(item.domain_type or (item.product.type if item.product else ""))
+        token_url = manager.build_link(domain, item.token)
+    return PurchaseWithProductOut(
+        id=item.id,
+        status=item.status,
+        digiseller_order_id=item.digiseller_order_id,
+        invoice_url=item.invoice_url,
+        token=item.token,
+        domain_type=item.domain_type,
+        expires_at=item.expires_at,
+        delivered_at=item.delivered_at,
+        metadata=item.extra,
+        created_at=item.created_at,
+        updated_at=item.updated_at,
+        product_title=item.product.title if item.product else "",
+        product_type=item.product.type if item.product else "",
+        variant_name=item.variant.name if item.variant else "",
+        token_url=token_url,
+    )
+
+
+def encode_cursor(item: PurchaseSession) -> str:
+    raw = json.dumps([item.created_at.isoformat(), item.id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, purchase_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(purchase_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
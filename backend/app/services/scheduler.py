@@ -3,11 +3,11 @@ from __future__ import annotations
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
 
 from ..core.config import get_settings
-from ..core.db import AsyncSessionMaker
-from ..jobs.cleanup import cleanup_expired_tokens
+from ..jobs.registry import JOBS
+from .jobs import job_runner
+from .leader import LeaderElection
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +21,21 @@ class Scheduler:
     def configure(self):
         if self._configured:
             return
-
-        cron = CronTrigger.from_crontab(self.settings.cleanup_cron)
-
-        async def run_cleanup():
-            removed = await cleanup_expired_tokens(AsyncSessionMaker)
-            if removed:
-                logger.info("Removed %s expired purchase sessions", removed)
-
-        self.scheduler.add_job(run_cleanup, cron, id="cleanup_expired_tokens", replace_existing=True)
+        for spec in JOBS.values():
+            if not spec.enabled(self.settings):
+                continue
+            # Within a process runs never overlap and a backlog of missed runs
+            # collapses into one; across processes the runner's lock applies.
+            self.scheduler.add_job(
+                job_runner.run,
+                spec.trigger(self.settings),
+                args=[spec.name],
+                id=spec.name,
+                name=spec.description,
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
         self._configured = True
 
     def start(self):
@@ -41,10 +47,25 @@ class Scheduler:
             self.scheduler.start()
             logger.info("Scheduler started")
 
+    def pause(self):
+        if self.scheduler.running:
+            self.scheduler.pause()
+            logger.info("Scheduler paused")
+
+    def resume(self):
+        """Start on first election, resume after a lost and regained leadership."""
+        if self.scheduler.running:
+            self.scheduler.resume()
+            logger.info("Scheduler resumed")
+        else:
+            self.start()
+
     async def shutdown(self):
         if self.scheduler.running:
-            await self.scheduler.shutdown()
+            # APScheduler 3's shutdown is synchronous and returns None.
+            self.scheduler.shutdown(wait=False)
             logger.info("Scheduler shut down")
 
 
 scheduler = Scheduler()
+leader_election = LeaderElection(on_elected=scheduler.resume, on_lost=scheduler.pause)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import secrets
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 from ..core.config import Settings, get_settings
@@ -26,3 +28,41 @@ class TokenManager:
 
     def build_link(self, domain: str, token: str) -> str:
         return f"https://{domain}/{token}"
+
+
+class NegativeTokenCache:
+    """Bounded set of recently looked-up tokens that do not exist.
+
+    Scanners probing random tokens are answered from memory instead of
+    Postgres. Entries expire after ``ttl_seconds`` and the oldest are
+    evicted past ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl_seconds: int | None = None):
+        settings = get_settings()
+        self.maxsize = maxsize if maxsize is not None else settings.token_negative_cache_size
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.token_negative_cache_ttl_seconds
+        self._entries: OrderedDict[str, float] = OrderedDict()
+
+    def __contains__(self, token: str) -> bool:
+        expires_at = self._entries.get(token)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[token]
+            return False
+        return True
+
+    def add(self, token: str) -> None:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[token] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+
+negative_token_cache = NegativeTokenCache()
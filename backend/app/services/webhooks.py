@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload
+
+from ..core.config import Settings, get_settings
+from ..core.db import AsyncSessionMaker
+from ..models import PurchaseSession, TokenEvent, WebhookInbox
+from ..models.enums import PurchaseStatus, TokenEventType
+from .events import count_token_event
+from .notifications import publish_purchase_update
+from .tokens import TokenManager, negative_token_cache
+
+logger = logging.getLogger(__name__)
+
+PAID_STATUSES = {"paid", "pay", "completed", "complete"}
+REFUNDED_STATUSES = {"refunded", "cancelled", "canceled"}
+
+# Statuses a purchase may be in for each Digiseller outcome to apply. Anything else is a
+# late or repeated notification (e.g. PAID after delivery) and must not move it backwards.
+PAYABLE_FROM = {PurchaseStatus.PENDING.value, PurchaseStatus.PAID.value}
+REFUNDABLE_FROM = {
+    PurchaseStatus.PENDING.value,
+    PurchaseStatus.PAID.value,
+    PurchaseStatus.DELIVERED.value,
+    PurchaseStatus.EXPIRED.value,
+    PurchaseStatus.FAILED.value,
+}
+TERMINAL_STATUSES = {PurchaseStatus.REFUNDED.value}
+
+
+class PurchaseNotFound(LookupError):
+    pass
+
+
+async def _append_event(session: AsyncSession, purchase: PurchaseSession, event_type: TokenEventType, payload: dict | None = None) -> None:
+    event = TokenEvent(purchase_id=purchase.id, event_type=event_type.value, payload=payload or {})
+    session.add(event)
+    count_token_event(event_type)
+    await session.flush()
+
+
+async def apply_digiseller_status(
+    session: AsyncSession,
+    order_id: str,
+    status: str,
+    details: dict[str, Any] | None = None,
+    settings: Settings | None = None,
+) -> PurchaseSession:
+    """Apply a Digiseller order status to its purchase. Shared by the webhook inbox and reconciliation.
+
+    The purchase row is locked, so concurrent notifications for one order are
+    serialized and a token is issued at most once. Transitions only go forward:
+    a refunded purchase is left alone and a late PAID does not reopen a
+    delivered, expired or failed one.
+    """
+    stmt = (
+        select(PurchaseSession)
+        .options(joinedload(PurchaseSession.product, innerjoin=True))
+        .where(PurchaseSession.digiseller_order_id == order_id)
+        .with_for_update(of=PurchaseSession)
+    )
+    purchase = await session.scalar(stmt)
+    if not purchase:
+        raise PurchaseNotFound(order_id)
+
+    manager = TokenManager(settings)
+    status_lower = status.lower()
+
+    if (
+        purchase.status in TERMINAL_STATUSES
+        or (status_lower in PAID_STATUSES and purchase.status not in PAYABLE_FROM)
+        or (status_lower in REFUNDED_STATUSES and purchase.status not in REFUNDABLE_FROM)
+    ):
+        logger.info("Ignoring Digiseller status %s for order %s in status %s", status_lower, order_id, purchase.status)
+        return purchase
+
+    if status_lower in PAID_STATUSES:
+        purchase.status = PurchaseStatus.PAID.value
+        if not purchase.token:
+            token = manager.generate_token()
+            negative_token_cache.discard(token)
+            purchase.token = token
+            purchase.expires_at = manager.expires_at()
+            await _append_event(session, purchase, TokenEventType.ISSUED, payload={"order_id": order_id})
+            await publish_purchase_update(
+                session, purchase, product_type=purchase.product.type, settings=settings, product_title=purchase.product.title
+            )
+    elif status_lower in REFUNDED_STATUSES:
+        purchase.status = PurchaseStatus.REFUNDED.value
+        purchase.token = None
+        await _append_event(session, purchase, TokenEventType.FAILED, payload={"status": status_lower})
+        await publish_purchase_update(session, purchase, settings=settings, product_title=purchase.product.title)
+    else:
+        await _append_event(session, purchase, TokenEventType.OPENED, payload={"status": status_lower})
+
+    purchase.extra = (purchase.extra or {}) | {"digiseller": details or {}}
+    return purchase
+
+
+def payload_hash(payload: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+async def store_webhook(session: AsyncSession, payload: dict[str, Any]) -> tuple[int, bool]:
+    """Insert a notification into the inbox. Returns ``(inbox_id, duplicate)``."""
+    key = {
+        "order_id": str(payload["order_id"]),
+        "status": str(payload["status"]).lower()[:32],
+        "payload_hash": payload_hash(payload),
+    }
+    stmt = (
+        pg_insert(WebhookInbox)
+        .values(**key, payload=payload, received_at=datetime.now(timezone.utc), attempts=0)
+        .on_conflict_do_nothing(constraint="uq_webhook_inbox_delivery")
+        .returning(WebhookInbox.id)
+    )
+    inbox_id = await session.scalar(stmt)
+    if inbox_id is not None:
+        return inbox_id, False
+    existing = await session.scalar(
+        select(WebhookInbox.id).where(*(getattr(WebhookInbox, name) == value for name, value in key.items()))
+    )
+    return existing, True
+
+
+async def process_inbox_row(session: AsyncSession, row: WebhookInbox, settings: Settings | None = None) -> PurchaseSession | None:
+    """Apply one locked inbox row; the purchase change and ``processed_at`` commit together."""
+    settings = settings or get_settings()
+    purchase = None
+    row.attempts += 1
+    try:
+        async with session.begin_nested():
+            purchase = await apply_digiseller_status(
+                session, row.order_id, row.payload.get("status", row.status), row.payload.get("details"), settings
+            )
+    except Exception as exc:
+        # PurchaseNotFound is retried too: the notification may arrive before its purchase
+        # is committed (sync invoices) or visible (after a failover).
+        if isinstance(exc, PurchaseNotFound):
+            row.error = "Purchase session not found"
+        else:
+            row.error = str(exc) or exc.__class__.__name__
+        if row.attempts >= settings.webhook_inbox_max_attempts:
+            logger.error("Giving up on webhook inbox row %s after %s attempts", row.id, row.attempts)
+            row.processed_at = datetime.now(timezone.utc)
+        return None
+    row.error = None
+    row.processed_at = datetime.now(timezone.utc)
+    return purchase
+
+
+def _pending_rows(limit: int):
+    return (
+        select(WebhookInbox)
+        .where(WebhookInbox.processed_at.is_(None))
+        .order_by(WebhookInbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+class WebhookInboxWorker:
+    """Drains the webhook inbox in the background.
+
+    The endpoint wakes it after each insert; it also polls every
+    ``webhook_inbox_poll_seconds`` to pick up retries and rows stored by other processes.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionMaker, settings: Settings | None = None):
+        self.settings = settings or get_settings()
+        self.session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.settings.webhook_mode != "inbox" or self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="webhook-inbox-worker")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.settings.webhook_inbox_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.process_batch() >= self.settings.webhook_inbox_batch_size:
+                    pass
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Webhook inbox batch failed")
+
+    async def process_batch(self) -> int:
+        async with self.session_factory() as session:
+            rows = (await session.scalars(_pending_rows(self.settings.webhook_inbox_batch_size))).all()
+            for row in rows:
+                await process_inbox_row(session, row, self.settings)
+            await session.commit()
+        return len(rows)
+
+    async def process_one(self, session: AsyncSession, inbox_id: int) -> PurchaseSession | None:
+        """Process a single row in the caller's transaction (``webhook_mode=inline``).
+
+        Returns ``None`` for a row already processed by an earlier delivery; a
+        row that failed before is retried, so provider redeliveries get through.
+        """
+        row = await session.scalar(select(WebhookInbox).where(WebhookInbox.id == inbox_id).with_for_update())
+        if row.processed_at is not None:
+            return None
+        purchase = await process_inbox_row(session, row, self.settings)
+        if purchase is None:
+            raise PurchaseNotFound(row.error or row.order_id)
+        return purchase
+
+
+webhook_inbox_worker = WebhookInboxWorker()
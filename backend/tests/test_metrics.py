@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+
+
+def test_routed_requests_are_timed_per_route_template():
+    # No `with`: the lifespan (DB, workers, scheduler) is not started.
+    client = TestClient(create_app())
+
+    assert client.get("/api/healthz").status_code == 200
+    assert client.get("/api/healthz").status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+
+    body = client.get("/metrics").text
+    assert 'okak_http_request_duration_seconds_count{method="GET",route="/api/healthz"} 2' in body
+    assert 'okak_http_responses_total{method="GET",route="/api/healthz",status="2xx"} 2.0' in body
+    assert 'okak_http_responses_total{method="",route="<unmatched>",status="4xx"} 1.0' in body
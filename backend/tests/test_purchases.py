@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_app_settings, get_db_session
+from app.api.routes import purchases
+from app.core.config import Settings
+from app.main import create_app
+from app.services.digiseller import InvoiceResult
+
+
+class FakeSession:
+    """Answers the two lookups create_purchase makes and fills in what the database would."""
+
+    def __init__(self, *scalars):
+        self._scalars = list(scalars)
+        self.added = []
+
+    async def scalar(self, stmt):
+        return self._scalars.pop(0)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        for number, obj in enumerate(self.added, start=1):
+            if getattr(obj, "id", None) is None:
+                obj.id = number
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        now = datetime.now(timezone.utc)
+        obj.created_at = obj.created_at or now
+        obj.updated_at = obj.updated_at or now
+
+
+def test_claimed_pool_invoice_keeps_its_order_id(monkeypatch):
+    variant = SimpleNamespace(
+        id=7,
+        product_id=3,
+        product=SimpleNamespace(is_active=True, type="gpt"),
+        payment_url=None,
+        digiseller_product_id="dg-product-1",
+    )
+    user = SimpleNamespace(id=1, username=None, first_name=None, last_name=None, language_code=None)
+    prepared = InvoiceResult(order_id="pool-order-42", invoice_url="https://pay.example/42", payload={"prepared": True})
+
+    async def claim(session, variant_id, purchase_id):
+        return prepared
+
+    monkeypatch.setattr(purchases, "claim_prepared_invoice", claim)
+    app = create_app()
+    app.dependency_overrides[get_db_session] = lambda: FakeSession(user, variant)
+    app.dependency_overrides[get_app_settings] = lambda: Settings(invoice_pool_enabled=True)
+
+    response = TestClient(app).post("/api/purchases/", json={"telegram_id": 100, "product_variant_id": 7})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["payment_url"] == prepared.invoice_url
+    assert body["purchase"]["digiseller_order_id"] == "pool-order-42"
+    assert body["purchase"]["invoice_url"] == prepared.invoice_url
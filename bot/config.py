@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,5 +12,50 @@ class BotSettings(BaseSettings):
     backend_api_url: str = "http://backend:8000/api"
     support_username: str | None = None
 
+    # polling: single process; webhook: aiohttp server behind nginx, any number of replicas
+    bot_mode: Literal["polling", "webhook"] = "polling"
+    bot_webhook_url: str = ""  # public base URL, e.g. https://shop.kcbot.ru
+    bot_webhook_path: str = "/telegram/webhook"
+    bot_webhook_secret: str = ""
+    bot_webhook_host: str = "0.0.0.0"
+    bot_webhook_port: int = 8080
+    bot_max_concurrent_updates: int = 100
+    bot_redis_url: str = ""  # shared update_id dedup store for replicas; in-memory when empty
+    bot_update_dedup_ttl: int = 3600
+
+    backend_timeout: float = 10.0
+    backend_connect_timeout: float = 5.0
+    backend_purchase_timeout: float = 30.0  # invoice creation waits on Digiseller
+    backend_max_connections: int = 100
+    backend_max_keepalive_connections: int = 20
+    backend_keepalive_expiry: float = 30.0
+    backend_http2: bool = False
+
+    catalog_cache_ttl: float = 60.0
+    purchases_cache_ttl: float = 30.0
+    purchases_cache_max_users: int = 10_000
+    read_primary_window: float = 10.0  # after a change, read this user's purchases from the primary DB
+
+    invoice_poll_attempts: int = 10
+    invoice_poll_interval: float = 1.0
+
+    internal_api_token: str = ""  # shared with the backend (OKAK_INTERNAL_API_TOKEN)
+    notifications_enabled: bool = True
+    notifications_wait: float = 25.0
+    notifications_batch_size: int = 50
+    notifications_retry_delay: float = 5.0
+
+    # Telegram allows ~30 msg/s per bot; split the global rate across replicas.
+    bot_global_rate: float = 30.0
+    bot_per_chat_rate: float = 1.0
+    bot_per_chat_burst: int = 3
+    bot_retry_after_attempts: int = 3
+
+    broadcast_enabled: bool = True
+    broadcast_poll_interval: float = 30.0
+    broadcast_chunk_size: int = 1000
+    broadcast_batch_size: int = 100  # recipients per checkpoint
+    broadcast_concurrency: int = 10
+
 
 settings = BotSettings()
@@ -22,10 +22,6 @@ from ..services.backend import BackendClient
 router = Router()
 
 
-def _backend_client() -> BackendClient:
-    return BackendClient()
-
-
 async def safe_edit_text(message: Message, text: str, **kwargs) -> None:
     try:
         await message.edit_text(text, **kwargs)
@@ -35,170 +31,161 @@ async def safe_edit_text(message: Message, text: str, **kwargs) -> None:
 
 
 @router.message(CommandStart())
-async def handle_start(message: Message) -> None:
-    client = _backend_client()
-    try:
-        user = message.from_user
-        if user:
-            await client.register_user(
-                {
-                    "telegram_id": user.id,
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "language_code": user.language_code,
-                }
-            )
-        await message.answer(
-            "Добро пожаловать! Выберите действие:",
-            reply_markup=main_menu_kb().as_markup(),
+async def handle_start(message: Message, backend: BackendClient) -> None:
+    user = message.from_user
+    if user:
+        await backend.register_user(
+            {
+                "telegram_id": user.id,
+                "username": user.username,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "language_code": user.language_code,
+            }
         )
-    finally:
-        await client.close()
+    await message.answer(
+        "Добро пожаловать! Выберите действие:",
+        reply_markup=main_menu_kb().as_markup(),
+    )
 
 
 @router.callback_query(MenuCallback.filter())
-async def handle_menu_callback(query: CallbackQuery, callback_data: MenuCallback) -> None:
-    client = _backend_client()
-    try:
-        action = callback_data.action
-        user = query.from_user
-        if action == "back_main":
+async def handle_menu_callback(query: CallbackQuery, callback_data: MenuCallback, backend: BackendClient) -> None:
+    action = callback_data.action
+    user = query.from_user
+    if action == "back_main":
+        await safe_edit_text(
+            query.message,
+            "Главное меню",
+            reply_markup=main_menu_kb().as_markup(),
+        )
+    elif action == "catalog":
+        products = await backend.list_products()
+        await safe_edit_text(
+            query.message,
+            "Выберите товар:",
+            reply_markup=product_list_kb(products).as_markup(),
+        )
+    elif action == "orders" and user:
+        purchases = await backend.get_user_purchases(user.id)
+        if purchases:
             await safe_edit_text(
                 query.message,
-                "Главное меню",
-                reply_markup=main_menu_kb().as_markup(),
+                "Ваши покупки:",
+                reply_markup=purchases_kb(purchases).as_markup(),
             )
-        elif action == "catalog":
-            products = await client.list_products()
+        else:
             await safe_edit_text(
                 query.message,
-                "Выберите товар:",
-                reply_markup=product_list_kb(products).as_markup(),
-            )
-        elif action == "orders" and user:
-            purchases = await client.get_user_purchases(user.id)
-            if purchases:
-                await safe_edit_text(
-                    query.message,
-                    "Ваши покупки:",
-                    reply_markup=purchases_kb(purchases).as_markup(),
-                )
-            else:
-                await safe_edit_text(
-                    query.message,
-                    "У вас пока нет покупок.",
-                    reply_markup=main_menu_kb().as_markup(),
-                )
-        elif action == "profile" and user:
-            profile = await client.get_user(user.id)
-            if not profile:
-                text = "Профиль не найден. Отправьте /start для регистрации."
-            else:
-                text = (
-                    "Профиль:\n"
-                    f"ID: {profile.get('telegram_id')}\n"
-                    f"Username: @{profile.get('username') or '—'}\n"
-                )
-            await safe_edit_text(query.message, text, reply_markup=main_menu_kb().as_markup())
-        elif action == "support":
-            kb = support_button(settings.support_username)
-            await query.message.answer(
-                "Связь с поддержкой:",
-                reply_markup=kb,
+                "У вас пока нет покупок.",
+                reply_markup=main_menu_kb().as_markup(),
             )
-            await query.answer()
-            return
+    elif action == "profile" and user:
+        profile = await backend.get_user(user.id)
+        if not profile:
+            text = "Профиль не найден. Отправьте /start для регистрации."
         else:
-            await query.message.edit_reply_markup(reply_markup=main_menu_kb().as_markup())
+            text = (
+                "Профиль:\n"
+                f"ID: {profile.get('telegram_id')}\n"
+                f"Username: @{profile.get('username') or '—'}\n"
+            )
+        await safe_edit_text(query.message, text, reply_markup=main_menu_kb().as_markup())
+    elif action == "support":
+        kb = support_button(settings.support_username)
+        await query.message.answer(
+            "Связь с поддержкой:",
+            reply_markup=kb,
+        )
         await query.answer()
-    finally:
-        await client.close()
+        return
+    else:
+        await query.message.edit_reply_markup(reply_markup=main_menu_kb().as_markup())
+    await query.answer()
 
 
 @router.callback_query(ProductCallback.filter())
-async def handle_product(query: CallbackQuery, callback_data: ProductCallback) -> None:
-    client = _backend_client()
-    try:
-        products = await client.list_products()
-        product = next((p for p in products if p.get("id") == callback_data.product_id), None)
-        if not product:
-            await query.answer("Товар не найден", show_alert=True)
-            return
-        variants = product.get("variants", [])
-        description = product.get("description") or "Описание отсутствует"
-        await safe_edit_text(
-            query.message,
-            f"{product.get('title')}\n\n{description}",
-            reply_markup=variants_kb(product.get("id"), variants).as_markup(),
-        )
-        await query.answer()
-    finally:
-        await client.close()
+async def handle_product(query: CallbackQuery, callback_data: ProductCallback, backend: BackendClient) -> None:
+    product = await backend.get_product(callback_data.product_id)
+    if not product:
+        await query.answer("Товар не найден", show_alert=True)
+        return
+    variants = product.get("variants", [])
+    description = product.get("description") or "Описание отсутствует"
+    await safe_edit_text(
+        query.message,
+        f"{product.get('title')}\n\n{description}",
+        reply_markup=variants_kb(product.get("id"), variants).as_markup(),
+    )
+    await query.answer()
 
 
 @router.callback_query(VariantCallback.filter())
-async def handle_variant(query: CallbackQuery, callback_data: VariantCallback) -> None:
+async def handle_variant(query: CallbackQuery, callback_data: VariantCallback, backend: BackendClient) -> None:
     user = query.from_user
     if not user:
         await query.answer("Пользователь не определен", show_alert=True)
         return
 
-    client = _backend_client()
-    try:
-        payload = {
-            "telegram_id": user.id,
-            "username": user.username,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "language_code": user.language_code,
-            "product_variant_id": callback_data.variant_id,
-        }
-        response = await client.create_purchase(payload)
-        payment_url = response.get("payment_url")
-        await query.answer("Ссылка сформирована")
-        if payment_url:
-            from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-
-            kb = InlineKeyboardMarkup(
-                inline_keyboard=[[InlineKeyboardButton(text="Перейти к оплате", url=payment_url)]]
-            )
-            await query.message.answer("Оплатите заказ по ссылке ниже", reply_markup=kb)
-        else:
-            await query.message.answer("Ссылка на оплату будет отправлена позже")
+    payload = {
+        "telegram_id": user.id,
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "language_code": user.language_code,
+        "product_variant_id": callback_data.variant_id,
+    }
+    response = await backend.create_purchase(payload)
+    payment_url = response.get("payment_url")
+    if response.get("invoice_pending") and backend.push_notifications:
+        # The backend pushes the link through the notification outbox once the invoice exists.
+        await query.answer("Формируем ссылку на оплату…")
         await query.message.answer(
-            "Возвращаемся в меню",
+            "Ссылка на оплату придёт следующим сообщением",
             reply_markup=main_menu_kb().as_markup(),
         )
-    finally:
-        await client.close()
+        return
+    if response.get("invoice_pending"):
+        await query.answer("Формируем ссылку на оплату…")
+        payment_url = await backend.wait_for_payment_url(response["purchase"]["id"])
+    else:
+        await query.answer("Ссылка сформирована")
+    if payment_url:
+        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="Перейти к оплате", url=payment_url)]]
+        )
+        await query.message.answer("Оплатите заказ по ссылке ниже", reply_markup=kb)
+    else:
+        await query.message.answer("Ссылка на оплату будет отправлена позже")
+    await query.message.answer(
+        "Возвращаемся в меню",
+        reply_markup=main_menu_kb().as_markup(),
+    )
 
 
 @router.callback_query(PurchaseCallback.filter())
-async def handle_purchase_info(query: CallbackQuery, callback_data: PurchaseCallback) -> None:
+async def handle_purchase_info(query: CallbackQuery, callback_data: PurchaseCallback, backend: BackendClient) -> None:
     if not query.from_user or callback_data.purchase_id is None:
         await query.answer()
         return
 
-    client = _backend_client()
-    try:
-        purchases = await client.get_user_purchases(query.from_user.id)
-        purchase = next((item for item in purchases if item.get("id") == callback_data.purchase_id), None)
-        if not purchase:
-            await query.answer("Покупка не найдена", show_alert=True)
-            return
-        text_lines = [f"Товар: {purchase.get('product_title')}"]
-        text_lines.append(f"Тариф: {purchase.get('variant_name')}")
-        text_lines.append(f"Статус: {purchase.get('status')}")
-        if purchase.get("expires_at"):
-            text_lines.append(f"Действительно до: {purchase.get('expires_at')}")
-        if purchase.get("token_url"):
-            text_lines.append(f"Ссылка: {purchase.get('token_url')}")
-        await safe_edit_text(
-            query.message,
-            "\n".join(text_lines),
-            reply_markup=purchases_kb(purchases).as_markup(),
-        )
-        await query.answer()
-    finally:
-        await client.close()
+    purchases = await backend.get_user_purchases(query.from_user.id)
+    purchase = next((item for item in purchases if item.get("id") == callback_data.purchase_id), None)
+    if not purchase:
+        await query.answer("Покупка не найдена", show_alert=True)
+        return
+    text_lines = [f"Товар: {purchase.get('product_title')}"]
+    text_lines.append(f"Тариф: {purchase.get('variant_name')}")
+    text_lines.append(f"Статус: {purchase.get('status')}")
+    if purchase.get("expires_at"):
+        text_lines.append(f"Действительно до: {purchase.get('expires_at')}")
+    if purchase.get("token_url"):
+        text_lines.append(f"Ссылка: {purchase.get('token_url')}")
+    await safe_edit_text(
+        query.message,
+        "\n".join(text_lines),
+        reply_markup=purchases_kb(purchases).as_markup(),
+    )
+    await query.answer()
@@ -8,20 +8,76 @@ from aiogram.enums import ParseMode
 
 from .config import settings
 from .handlers import start
+from .services.backend import BackendClient
+from .services.broadcast import BroadcastRunner
+from .services.notifications import NotificationConsumer
+from .services.ratelimit import OutgoingRateLimiter
+from .services.updates import UpdateGate, create_update_store
 
 logging.basicConfig(level=logging.INFO)
 
 
-def create_dispatcher() -> Dispatcher:
-    dp = Dispatcher()
+def create_dispatcher(backend: BackendClient, gate: UpdateGate | None = None) -> Dispatcher:
+    # Workflow data is passed to every handler that declares a matching argument.
+    dp = Dispatcher(backend=backend)
+    if gate is not None:
+        dp.update.outer_middleware(gate)
     dp.include_router(start.router)
     return dp
 
 
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+    async def register_webhook() -> None:
+        # Every replica registers the same URL; the call is idempotent. Nothing is
+        # removed on shutdown, so a restart or scale-down never drops updates.
+        await bot.set_webhook(
+            settings.bot_webhook_url.rstrip("/") + settings.bot_webhook_path,
+            secret_token=settings.bot_webhook_secret or None,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+
+    dp.startup.register(register_webhook)
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=settings.bot_webhook_secret or None,
+        handle_in_background=True,
+    ).register(app, path=settings.bot_webhook_path)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, settings.bot_webhook_host, settings.bot_webhook_port).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
 async def main() -> None:
     bot = Bot(token=settings.telegram_bot_token, parse_mode=ParseMode.HTML)
-    dp = create_dispatcher()
-    await dp.start_polling(bot)
+    bot.session.middleware(OutgoingRateLimiter(settings))
+    backend = BackendClient()
+    store = create_update_store(settings)
+    dp = create_dispatcher(backend, UpdateGate(store, settings.bot_max_concurrent_updates))
+    notifications = NotificationConsumer(bot, backend)
+    notifications.start()
+    broadcasts = BroadcastRunner(bot, backend)
+    broadcasts.start()
+    try:
+        if settings.bot_mode == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await dp.start_polling(bot)
+    finally:
+        await broadcasts.stop()
+        await notifications.stop()
+        await store.close()
+        await backend.close()
 
 
 if __name__ == "__main__":
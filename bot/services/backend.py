@@ -1,19 +1,52 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import Any
 
 import httpx
 
-from ..config import settings
+from ..config import BotSettings, settings as default_settings
+from .cache import TTLCache
 
 
 class BackendClient:
-    def __init__(self, base_url: str | None = None):
-        self.base_url = base_url or settings.backend_api_url.rstrip("/")
+    """Long-lived client for the backend API, shared by all handlers."""
+
+    def __init__(self, base_url: str | None = None, settings: BotSettings | None = None):
+        self.settings = settings or default_settings
+        self.base_url = (base_url or self.settings.backend_api_url).rstrip("/")
+        self._purchase_timeout = httpx.Timeout(
+            self.settings.backend_purchase_timeout,
+            connect=self.settings.backend_connect_timeout,
+        )
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
-            timeout=15.0,
+            timeout=httpx.Timeout(self.settings.backend_timeout, connect=self.settings.backend_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.settings.backend_max_connections,
+                max_keepalive_connections=self.settings.backend_max_keepalive_connections,
+                keepalive_expiry=self.settings.backend_keepalive_expiry,
+            ),
+            http2=self.settings.backend_http2,
             follow_redirects=True,
+            # The backend's read-your-writes cookie would pin every user to the primary;
+            # freshness is requested per user with X-Read-Primary instead.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+        self._catalog: list[dict[str, Any]] | None = None
+        self._catalog_by_id: dict[int, dict[str, Any]] = {}
+        self._catalog_etag: str | None = None
+        self._catalog_expires_at = 0.0
+        self._catalog_lock = asyncio.Lock()
+        self._purchases: TTLCache[int, list[dict[str, Any]]] = TTLCache(
+            maxsize=self.settings.purchases_cache_max_users,
+            ttl=self.settings.purchases_cache_ttl,
+        )
+        self._changed_users: TTLCache[int, bool] = TTLCache(
+            maxsize=self.settings.purchases_cache_max_users,
+            ttl=self.settings.read_primary_window,
         )
 
     async def close(self) -> None:
@@ -25,20 +58,124 @@ class BackendClient:
         return response.json()
 
     async def list_products(self) -> list[dict[str, Any]]:
-        response = await self._client.get("/products")
-        response.raise_for_status()
-        return response.json().get("items", [])
+        if self._catalog is not None and self._catalog_expires_at > time.monotonic():
+            return self._catalog
+        async with self._catalog_lock:
+            if self._catalog is not None and self._catalog_expires_at > time.monotonic():
+                return self._catalog
+            headers = {}
+            if self._catalog is not None and self._catalog_etag:
+                headers["If-None-Match"] = self._catalog_etag
+            response = await self._client.get("/products/", headers=headers)
+            if response.status_code != httpx.codes.NOT_MODIFIED:
+                response.raise_for_status()
+                self._catalog = response.json().get("items", [])
+                self._catalog_by_id = {item.get("id"): item for item in self._catalog}
+                self._catalog_etag = response.headers.get("ETag")
+            self._catalog_expires_at = time.monotonic() + self.settings.catalog_cache_ttl
+            return self._catalog
+
+    async def get_product(self, product_id: int) -> dict[str, Any] | None:
+        await self.list_products()
+        return self._catalog_by_id.get(product_id)
+
+    def invalidate_catalog(self) -> None:
+        self._catalog_expires_at = 0.0
 
     async def create_purchase(self, payload: dict[str, Any]) -> dict[str, Any]:
-        response = await self._client.post("/purchases", json=payload)
+        response = await self._client.post("/purchases/", json=payload, timeout=self._purchase_timeout)
         response.raise_for_status()
+        self.invalidate_purchases(payload["telegram_id"])
         return response.json()
 
+    async def get_purchase_status(self, purchase_id: int) -> dict[str, Any]:
+        response = await self._client.get(f"/purchases/{purchase_id}")
+        response.raise_for_status()
+        return response.json()
+
+    async def wait_for_payment_url(self, purchase_id: int) -> str | None:
+        """Poll a purchase whose invoice is being created in the background."""
+        for _ in range(self.settings.invoice_poll_attempts):
+            await asyncio.sleep(self.settings.invoice_poll_interval)
+            status = await self.get_purchase_status(purchase_id)
+            if not status.get("invoice_pending"):
+                return status.get("payment_url")
+        return None
+
     async def get_user_purchases(self, telegram_id: int) -> list[dict[str, Any]]:
-        response = await self._client.get(f"/users/{telegram_id}/purchases")
+        cached = self._purchases.get(telegram_id)
+        if cached is not None:
+            return cached
+        headers = {"X-Read-Primary": "1"} if self._changed_users.get(telegram_id) else None
+        response = await self._client.get(f"/users/{telegram_id}/purchases", headers=headers)
         response.raise_for_status()
+        purchases = response.json()
+        self._purchases.set(telegram_id, purchases)
+        return purchases
+
+    def invalidate_purchases(self, telegram_id: int) -> None:
+        """Drop a user's cached purchases, e.g. when the backend reports a status change."""
+        self._purchases.pop(telegram_id)
+        self._changed_users.set(telegram_id, True)
+
+    async def poll_notifications(self) -> list[dict[str, Any]]:
+        """Long-poll the backend outbox; returned items are leased to this bot until acknowledged."""
+        wait = self.settings.notifications_wait
+        response = await self._client.get(
+            "/notifications/",
+            params={"wait": wait, "limit": self.settings.notifications_batch_size},
+            headers=self._internal_headers,
+            timeout=httpx.Timeout(wait + self.settings.backend_timeout, connect=self.settings.backend_connect_timeout),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def ack_notifications(self, ids: list[int]) -> None:
+        response = await self._client.post("/notifications/ack", json={"ids": ids}, headers=self._internal_headers)
+        response.raise_for_status()
+
+    async def claim_broadcast(self) -> dict[str, Any] | None:
+        response = await self._client.post("/broadcasts/claim", headers=self._internal_headers)
+        response.raise_for_status()
+        if response.status_code == httpx.codes.NO_CONTENT:
+            return None
         return response.json()
 
+    async def broadcast_recipients(self, after_user_id: int, limit: int) -> list[tuple[int, int]]:
+        """``(user_id, telegram_id)`` pairs after the checkpoint, streamed from the backend."""
+        recipients: list[tuple[int, int]] = []
+        async with self._client.stream(
+            "GET",
+            "/broadcasts/recipients",
+            params={"after": after_user_id, "limit": limit},
+            headers=self._internal_headers,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    user_id, telegram_id = line.split()
+                    recipients.append((int(user_id), int(telegram_id)))
+        return recipients
+
+    async def broadcast_progress(self, broadcast_id: int, payload: dict[str, Any]) -> str:
+        """Checkpoint and renew the lease; any status but ``running`` means stop sending."""
+        response = await self._client.post(
+            f"/broadcasts/{broadcast_id}/progress", json=payload, headers=self._internal_headers
+        )
+        if response.status_code == httpx.codes.CONFLICT:
+            return "lost"  # the lease lapsed and another replica claimed the broadcast
+        response.raise_for_status()
+        return response.json()["status"]
+
+    @property
+    def push_notifications(self) -> bool:
+        """Whether payment links and delivery updates arrive through the notification outbox."""
+        return self.settings.notifications_enabled and bool(self.settings.internal_api_token)
+
+    @property
+    def _internal_headers(self) -> dict[str, str]:
+        return {"X-Internal-Token": self.settings.internal_api_token}
+
     async def get_user(self, telegram_id: int) -> dict[str, Any] | None:
         response = await self._client.get(f"/users/{telegram_id}")
         if response.status_code == 404:
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+
+from .backend import BackendClient
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastRunner:
+    """Sends admin broadcasts created in the admin panel.
+
+    The backend leases one broadcast to one replica. Recipients are fetched
+    a chunk at a time after the stored checkpoint, sent in batches of
+    ``broadcast_batch_size`` and checkpointed after each batch, so a restart
+    resumes at most one batch back. Pacing comes from the bot session's
+    ``OutgoingRateLimiter``.
+    """
+
+    def __init__(self, bot: Bot, backend: BackendClient):
+        self.bot = bot
+        self.backend = backend
+        self.settings = backend.settings
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.settings.broadcast_enabled and self.settings.internal_api_token and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="broadcast-runner")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                broadcast = await self.backend.claim_broadcast()
+                if broadcast is not None:
+                    await self.send(broadcast)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broadcast run failed")
+            await asyncio.sleep(self.settings.broadcast_poll_interval)
+
+    async def send(self, broadcast: dict[str, Any]) -> None:
+        broadcast_id = broadcast["id"]
+        progress = {
+            "claim_token": broadcast["claim_token"],
+            "last_user_id": broadcast["last_user_id"],
+            "sent": broadcast["sent"],
+            "failed": broadcast["failed"],
+        }
+        slots = asyncio.Semaphore(self.settings.broadcast_concurrency)
+        logger.info("Broadcast %s: resuming after user %s", broadcast_id, progress["last_user_id"])
+
+        async def deliver(telegram_id: int) -> bool:
+            async with slots:
+                try:
+                    await self.bot.send_message(telegram_id, broadcast["text"])
+                except TelegramAPIError as exc:  # blocked the bot, deleted account, flood retries exhausted
+                    logger.debug("Broadcast %s: %s skipped: %s", broadcast_id, telegram_id, exc)
+                    return False
+                return True
+
+        while True:
+            recipients = await self.backend.broadcast_recipients(
+                progress["last_user_id"], self.settings.broadcast_chunk_size
+            )
+            if not recipients:
+                await self.backend.broadcast_progress(broadcast_id, progress | {"done": True})
+                logger.info("Broadcast %s finished: %s sent, %s failed", broadcast_id, progress["sent"], progress["failed"])
+                return
+            size = self.settings.broadcast_batch_size
+            for start in range(0, len(recipients), size):
+                batch = recipients[start : start + size]
+                results = await asyncio.gather(*(deliver(telegram_id) for _, telegram_id in batch))
+                progress["sent"] += sum(results)
+                progress["failed"] += len(results) - sum(results)
+                progress["last_user_id"] = batch[-1][0]
+                status = await self.backend.broadcast_progress(broadcast_id, progress)
+                if status != "running":
+                    logger.info("Broadcast %s stopped: %s", broadcast_id, status)
+                    return
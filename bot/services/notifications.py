@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from .backend import BackendClient
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {
+    "delivered": "Заказ выполнен. Спасибо за покупку!",
+    "expired": "Срок действия ссылки истёк.",
+    "failed": "Не удалось выполнить заказ. Напишите в поддержку.",
+    "refunded": "Платёж возвращён, ссылка больше не действует.",
+}
+
+
+def render_notification(item: dict[str, Any]) -> tuple[str, InlineKeyboardMarkup | None] | None:
+    """Message text and keyboard for one backend notification, or ``None`` if there is nothing to say."""
+    payload = item.get("payload") or {}
+    title = payload.get("product_title")
+    prefix = f"{title}: " if title else ""
+    if item.get("event") == "invoice_ready" and payload.get("payment_url"):
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="Перейти к оплате", url=payload["payment_url"])]]
+        )
+        return "Оплатите заказ по ссылке ниже", kb
+    if item.get("event") == "invoice_failed":
+        return "Не удалось сформировать ссылку на оплату. Попробуйте ещё раз позже.", None
+    if payload.get("token_url"):
+        kb = InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="Открыть", url=payload["token_url"])]]
+        )
+        return f"{prefix}оплата получена! Ваша ссылка готова.", kb
+    text = STATUS_TEXT.get(payload.get("status"))
+    if text is None:
+        return None
+    return prefix + text, None
+
+
+class NotificationConsumer:
+    """Long-polls purchase notifications from the backend and messages the users.
+
+    A notification is acknowledged once Telegram accepted the message (or the
+    user blocked the bot); anything else is redelivered by the backend after
+    its lease expires.
+    """
+
+    def __init__(self, bot: Bot, backend: BackendClient):
+        self.bot = bot
+        self.backend = backend
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.backend.push_notifications and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="notification-consumer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                items = await self.backend.poll_notifications()
+                if items:
+                    delivered = [item["id"] for item in items if await self.deliver(item)]
+                    if delivered:
+                        await self.backend.ack_notifications(delivered)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification polling failed")
+                await asyncio.sleep(self.backend.settings.notifications_retry_delay)
+
+    async def deliver(self, item: dict[str, Any]) -> bool:
+        telegram_id = item["telegram_id"]
+        self.backend.invalidate_purchases(telegram_id)
+        rendered = render_notification(item)
+        if rendered is None:
+            return True
+        text, kb = rendered
+        try:
+            await self.bot.send_message(telegram_id, text, reply_markup=kb)
+        except TelegramForbiddenError:
+            return True
+        except TelegramRetryAfter as exc:
+            await asyncio.sleep(exc.retry_after)
+            return False
+        except Exception:
+            logger.exception("Failed to deliver notification %s", item["id"])
+            return False
+        return True
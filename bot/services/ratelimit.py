@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from ..config import BotSettings
+from .cache import TTLCache
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """``rate`` tokens per second, up to ``capacity`` saved for bursts. Waiters are served in order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class OutgoingRateLimiter(BaseRequestMiddleware):
+    """Session middleware pacing every chat-bound API call: handler replies, notifications and broadcasts.
+
+    A global bucket keeps the bot under Telegram's overall limit and a
+    per-chat bucket under the per-chat one. A 429 pauses all sending for
+    ``retry_after`` seconds and the call is retried.
+    """
+
+    def __init__(self, settings: BotSettings):
+        self.settings = settings
+        self._global = TokenBucket(settings.bot_global_rate, settings.bot_global_rate)
+        self._chats: TTLCache[int | str, TokenBucket] = TTLCache(maxsize=10_000, ttl=60)
+        self._resume_at = 0.0
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.settings.bot_per_chat_rate, self.settings.bot_per_chat_burst)
+        # Re-set on every use so active chats keep their bucket.
+        self._chats.set(chat_id, bucket)
+        return bucket
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or isinstance(method, AnswerCallbackQuery):
+            return await make_request(bot, method)
+
+        attempt = 0
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._chat_bucket(chat_id).acquire()
+            await self._global.acquire()
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                self._resume_at = max(self._resume_at, time.monotonic() + exc.retry_after)
+                logger.warning("Telegram flood control: pausing %ss (%s)", exc.retry_after, type(method).__name__)
+                if attempt > self.settings.bot_retry_after_attempts:
+                    raise
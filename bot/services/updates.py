@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from ..config import BotSettings
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryUpdateStore:
+    """Per-process record of seen update ids; enough for a single replica."""
+
+    def __init__(self, ttl: float, maxsize: int = 100_000):
+        self._seen: TTLCache[int, bool] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def claim(self, update_id: int) -> bool:
+        if self._seen.get(update_id):
+            return False
+        self._seen.set(update_id, True)
+        return True
+
+    async def close(self) -> None:
+        self._seen.clear()
+
+
+class RedisUpdateStore:
+    """Update ids shared by all replicas; ``SET NX`` makes exactly one of them win."""
+
+    def __init__(self, url: str, ttl: int):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self.ttl = ttl
+
+    async def claim(self, update_id: int) -> bool:
+        return bool(await self._redis.set(f"okak:bot:update:{update_id}", 1, nx=True, ex=self.ttl))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_update_store(settings: BotSettings) -> MemoryUpdateStore | RedisUpdateStore:
+    if settings.bot_redis_url:
+        return RedisUpdateStore(settings.bot_redis_url, settings.bot_update_dedup_ttl)
+    return MemoryUpdateStore(settings.bot_update_dedup_ttl)
+
+
+class UpdateGate(BaseMiddleware):
+    """Outer update middleware: drops redelivered updates and bounds concurrent handling.
+
+    Telegram retries a webhook delivery it considers failed, possibly to
+    another replica, so the same ``update_id`` can arrive twice.
+    """
+
+    def __init__(self, store: MemoryUpdateStore | RedisUpdateStore, max_concurrent: int):
+        self.store = store
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            try:
+                fresh = await self.store.claim(event.update_id)
+            except Exception:  # a store outage must not stop the bot
+                logger.exception("Update dedup store unavailable")
+                fresh = True
+            if not fresh:
+                logger.debug("Skipping duplicate update %s", event.update_id)
+                return None
+        async with self._slots:
+            return await handler(event, data)